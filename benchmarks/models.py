@@ -0,0 +1,112 @@
+from enum import Enum
+from typing import Any, Dict, List, Literal, NamedTuple, Tuple, Type
+
+from pydantic import BaseModel, Json, create_model
+
+
+class Color(Enum):
+    red = "red"
+    green = "green"
+    blue = "blue"
+
+
+class Plugin:
+    pass
+
+
+class OtherPlugin(Plugin):
+    pass
+
+
+class FieldKind(NamedTuple):
+    """Synthetic field definition: type annotation, default value and command line values."""
+
+    annotation: Any
+    default: Any
+    values: Tuple[str, ...]
+    flag: bool = False
+
+
+FIELD_KINDS: Dict[str, FieldKind] = {
+    "int": FieldKind(int, 1, ("2",)),
+    "str": FieldKind(str, "a", ("b",)),
+    "float": FieldKind(float, 1.0, ("2.5",)),
+    "bool": FieldKind(bool, False, (), flag=True),
+    "enum": FieldKind(Color, Color.red, ("blue",)),
+    "literal": FieldKind(Literal["a", "b"], "a", ("b",)),
+    "list": FieldKind(List[int], [], ("1", "2", "3")),
+    "dict": FieldKind(Dict[str, int], {}, ('{"a": 1}',)),
+    "json": FieldKind(Json, None, ('{"a": [1, 2]}',)),
+    "type": FieldKind(Type[Plugin], Plugin, ("benchmarks.models.OtherPlugin",)),
+    "bytes": FieldKind(bytes, b"a", ("b",)),
+}
+MIXES: Dict[str, Tuple[str, ...]] = {
+    "primitive": ("int", "str", "float", "bool"),
+    "complex": ("enum", "literal", "list", "dict", "json", "type", "bytes"),
+    "all": tuple(FIELD_KINDS),
+}
+
+
+def make_model(width: int, depth: int = 0, mix: str = "all", name: str = "Model") -> Type[BaseModel]:
+    """Creates a synthetic model with `width` primitive fields per level, and `depth` levels of nesting.
+
+    Args:
+        width (int): number of non-nested fields for each model.
+        depth (int, optional): number of nested levels below the root. Defaults to 0.
+        mix (str, optional): name of the field types mix, see `MIXES`. Defaults to "all".
+        name (str, optional): name of the model class. Defaults to "Model".
+
+    Returns:
+        Type[BaseModel]: generated model class.
+    """
+    kinds = MIXES[mix]
+    fields: Dict[str, Any] = {}
+    for i in range(width):
+        kind = FIELD_KINDS[kinds[i % len(kinds)]]
+        fields[f"field_{i}"] = (kind.annotation, kind.default)
+    if depth > 0:
+        child = make_model(width, depth - 1, mix=mix, name=f"{name}Child")
+        fields["child"] = (child, child())
+    return create_model(name, **fields)
+
+
+def export_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """Makes the given model reachable from this module under its name, as models defined in source files,
+    so that the options cache can validate it through the module file instead of its fingerprint.
+
+    Args:
+        model (Type[BaseModel]): model created by `make_model`.
+
+    Returns:
+        Type[BaseModel]: the same model.
+    """
+    model.__module__ = __name__
+    model.__qualname__ = model.__name__
+    globals()[model.__name__] = model
+    return model
+
+
+def make_args(width: int, depth: int = 0, mix: str = "all", prefix: str = "") -> List[str]:
+    """Creates a list of command line arguments that sets every field of a model created by `make_model`.
+
+    Args:
+        width (int): number of non-nested fields for each model.
+        depth (int, optional): number of nested levels below the root. Defaults to 0.
+        mix (str, optional): name of the field types mix, see `MIXES`. Defaults to "all".
+        prefix (str, optional): option prefix of nested models. Defaults to "".
+
+    Returns:
+        List[str]: command line arguments.
+    """
+    kinds = MIXES[mix]
+    args: List[str] = []
+    for i in range(width):
+        kind = FIELD_KINDS[kinds[i % len(kinds)]]
+        option = f"--{prefix}field-{i}"
+        if kind.flag:
+            args.append(option)
+        for value in kind.values:
+            args.extend((option, value))
+    if depth > 0:
+        args.extend(make_args(width, depth - 1, mix=mix, prefix=f"{prefix}child."))
+    return args
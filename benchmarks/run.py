@@ -0,0 +1,330 @@
+"""
+Benchmark suite for clidantic: measures the cost of building parsers, parsing arguments and creating models
+on synthetic configurations of varying width, nesting depth and field types.
+
+Usage: `python -m benchmarks.run --width 10 100 --depth 0 2 --output results.json`
+Passing `--baseline old.json` prints the relative change of each measure with respect to a previous run.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Type
+
+import click
+import pydantic
+from click.testing import CliRunner
+
+import clidantic
+from benchmarks.models import MIXES, export_model, make_args, make_model
+from clidantic import Parser
+from clidantic.cache import cached_settings_to_specs
+from clidantic.click import _classify_cached
+from clidantic.convert import kwargs_to_settings, settings_paths, settings_to_options, settings_to_specs
+
+
+class Case(NamedTuple):
+    width: int
+    depth: int
+    mix: str
+
+    @property
+    def name(self) -> str:
+        return f"w{self.width}-d{self.depth}-{self.mix}"
+
+
+BENCHMARKS: Dict[str, Callable[[Case, int], Dict[str, Any]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """Registers a benchmark function, receiving the case and the number of repetitions."""
+
+    def decorator(function: Callable[[Case, int], Dict[str, Any]]) -> Callable:
+        BENCHMARKS[name] = function
+        return function
+
+    return decorator
+
+
+def measure(function: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """Times the given function, returning statistics in seconds per call.
+
+    Args:
+        function (Callable[[], Any]): function to be measured.
+        repeat (int): number of measurements.
+        setup (Optional[Callable[[], Any]], optional): untimed function called before each measure. Defaults to None.
+
+    Returns:
+        Dict[str, float]: minimum, median and mean times.
+    """
+    timings: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings), "mean": statistics.fmean(timings)}
+
+
+def build_parser(case: Case, model: Optional[Type[pydantic.BaseModel]] = None, **kwargs: Any) -> Parser:
+    model = model or make_model(case.width, case.depth, case.mix)
+    cli = Parser(**kwargs)
+
+    @cli.command()
+    def run(config: model):
+        return config
+
+    return cli
+
+
+@benchmark("settings_to_options")
+def bench_settings_to_options(case: Case, repeat: int) -> Dict[str, Any]:
+    model = make_model(case.width, case.depth, case.mix)
+    cold = measure(lambda: list(settings_to_options(model, ".", "__")), repeat, setup=_classify_cached.cache_clear)
+    warm = measure(lambda: list(settings_to_options(model, ".", "__")), repeat)
+    return {"cold": cold, "warm": warm}
+
+
+@benchmark("options_cache")
+def bench_options_cache(case: Case, repeat: int) -> Dict[str, Any]:
+    model = export_model(make_model(case.width, case.depth, case.mix, name=f"Cached{case.name.replace('-', '_')}"))
+    # start-up cost without cache, against specs read from a warm cache directory
+    uncached = measure(lambda: list(settings_to_specs(model, ".", "__")), repeat, setup=_classify_cached.cache_clear)
+    with tempfile.TemporaryDirectory() as directory:
+        cached_settings_to_specs(model, ".", "__", directory=Path(directory))
+        warm = measure(
+            lambda: cached_settings_to_specs(model, ".", "__", directory=Path(directory)),
+            repeat,
+            setup=_classify_cached.cache_clear,
+        )
+    return {"uncached": uncached, "warm": warm}
+
+
+@benchmark("parser_build")
+def bench_parser_build(case: Case, repeat: int) -> Dict[str, Any]:
+    return {"time": measure(lambda: build_parser(case)._update_entrypoint(), repeat)}
+
+
+@benchmark("update_entrypoint")
+def bench_update_entrypoint(case: Case, repeat: int) -> Dict[str, Any]:
+    cli = build_parser(case)
+    return {"time": measure(cli._update_entrypoint, repeat)}
+
+
+@benchmark("help")
+def bench_help(case: Case, repeat: int) -> Dict[str, Any]:
+    model = make_model(case.width, case.depth, case.mix)
+    runner = CliRunner()
+    # first rendering, on new commands with options already built
+    commands: List[click.Command] = []
+
+    def setup() -> None:
+        cli = build_parser(case, model=model)
+        cli._update_entrypoint()
+        commands[:] = [cli.entrypoint]
+
+    cold = measure(lambda: runner.invoke(commands[0], ["--help"]), repeat, setup=setup)
+    warm = measure(lambda: runner.invoke(commands[0], ["--help"]), repeat)
+    # new lazy parsers, reading the rendered message from disk without building options
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["CLIDANTIC_CACHE_DIR"] = directory
+        try:
+            runner.invoke(build_parser(case, model=model, lazy=True, cache=True), ["--help"])
+            disk = measure(
+                lambda: runner.invoke(build_parser(case, model=model, lazy=True, cache=True), ["--help"]), repeat
+            )
+        finally:
+            del os.environ["CLIDANTIC_CACHE_DIR"]
+    return {"cold": cold, "warm": warm, "disk": disk}
+
+
+@benchmark("invoke")
+def bench_invoke(case: Case, repeat: int) -> Dict[str, Any]:
+    cli = build_parser(case)
+    cli._update_entrypoint()
+    runner = CliRunner()
+    args = make_args(case.width, case.depth, case.mix)
+    result = runner.invoke(cli.entrypoint, args, standalone_mode=False)
+    assert result.exit_code == 0, result.output
+    return {"time": measure(lambda: runner.invoke(cli.entrypoint, args, standalone_mode=False), repeat)}
+
+
+@benchmark("fast_parse")
+def bench_fast_parse(case: Case, repeat: int) -> Dict[str, Any]:
+    model = make_model(case.width, case.depth, case.mix)
+    args = make_args(case.width, case.depth, case.mix)
+    results: Dict[str, Any] = {}
+    for name, fast in (("click", False), ("fast", True)):
+        cli = build_parser(case, model=model, fast_parse=fast)
+        cli.invoke(args)
+        results[name] = measure(lambda: cli.invoke(args), repeat)
+    return results
+
+
+@benchmark("conversion")
+def bench_conversion(case: Case, repeat: int) -> Dict[str, Any]:
+    model = make_model(case.width, case.depth, case.mix)
+    args = make_args(case.width, case.depth, case.mix)
+    results: Dict[str, Any] = {}
+    for name in ("click", "pydantic"):
+        cli = build_parser(case, model=model, conversion=name)
+        cli.invoke(args)
+        results[name] = measure(lambda: cli.invoke(args), repeat)
+    return results
+
+
+def _model_values(instance: pydantic.BaseModel) -> Dict[str, Any]:
+    # keyword arguments recreating the instance: JSON fields only accept strings
+    values: Dict[str, Any] = {}
+    for name, field in instance.__fields__.items():
+        value = getattr(instance, name)
+        if isinstance(value, pydantic.BaseModel):
+            value = _model_values(value)
+        elif field.parse_json:
+            value = json.dumps(value)
+        values[name] = value
+    return values
+
+
+@benchmark("call_overhead")
+def bench_call_overhead(case: Case, repeat: int) -> Dict[str, Any]:
+    cli = build_parser(case)
+    args = make_args(case.width, case.depth, case.mix)
+    config = cli.invoke(args)
+    values = _model_values(config)
+    function = cli.entrypoint.callback.function
+    runner = CliRunner()
+    return {
+        "runner": measure(lambda: runner.invoke(cli.entrypoint, args, standalone_mode=False), repeat),
+        "invoke": measure(lambda: cli.invoke(args), repeat),
+        "call": measure(lambda: cli.call("run", **values), repeat),
+        "function": measure(lambda: function(type(config)(**values)), repeat),
+    }
+
+
+@benchmark("kwargs_to_settings")
+def bench_kwargs_to_settings(case: Case, repeat: int) -> Dict[str, Any]:
+    model = make_model(case.width, case.depth, case.mix)
+    options = list(settings_to_options(model, ".", "__"))
+    kwargs = {option.name: "value" for option in options}
+    paths = settings_paths(options)
+    return {
+        "split": measure(lambda: kwargs_to_settings(kwargs, "__"), repeat),
+        "table": measure(lambda: kwargs_to_settings(kwargs, "__", paths=paths), repeat),
+    }
+
+
+@benchmark("memory")
+def bench_memory(case: Case, repeat: int) -> Dict[str, Any]:
+    args = make_args(case.width, case.depth, case.mix)
+    model = make_model(case.width, case.depth, case.mix)
+    results: Dict[str, Any] = {}
+    # full click options against compact specs, creating options only while invoking
+    for name, compact in (("options", False), ("compact", True)):
+        _classify_cached.cache_clear()
+        tracemalloc.start()
+        try:
+            cli = build_parser(case, model=model, compact=compact)
+            cli._update_entrypoint()
+            built, _ = tracemalloc.get_traced_memory()
+            CliRunner().invoke(cli.entrypoint, args, standalone_mode=False)
+            resident, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        results[name] = {"built_bytes": built, "resident_bytes": resident, "peak_bytes": peak}
+    return results
+
+
+def run(cases: Iterable[Case], names: Iterable[str], repeat: int) -> Dict[str, Any]:
+    """Executes the selected benchmarks on every case.
+
+    Args:
+        cases (Iterable[Case]): model configurations.
+        names (Iterable[str]): names of the benchmarks to execute.
+        repeat (int): number of repetitions for each measure.
+
+    Returns:
+        Dict[str, Any]: JSON-compatible report, including environment information.
+    """
+    results = []
+    for case in cases:
+        for name in names:
+            print(f"running {name} on {case.name}", file=sys.stderr)
+            results.append({"benchmark": name, "case": case._asdict(), "results": BENCHMARKS[name](case, repeat)})
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "clidantic": clidantic.__version__,
+            "click": click.__version__,
+            "pydantic": pydantic.VERSION,
+        },
+        "results": results,
+    }
+
+
+def _flatten(prefix: str, value: Any) -> Dict[str, float]:
+    if isinstance(value, dict):
+        flat: Dict[str, float] = {}
+        for key, item in value.items():
+            flat.update(_flatten(f"{prefix}.{key}", item))
+        return flat
+    return {prefix: value}
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Compares two reports, returning the relative change of every common measure.
+
+    Args:
+        report (Dict[str, Any]): current report.
+        baseline (Dict[str, Any]): previous report, used as reference.
+
+    Returns:
+        List[str]: one line for each measure, e.g. 'invoke[w10-d0-all].time.min: +5.2%'.
+    """
+
+    def index(data: Dict[str, Any]) -> Dict[str, float]:
+        flat: Dict[str, float] = {}
+        for entry in data["results"]:
+            case = Case(**entry["case"])
+            flat.update(_flatten(f"{entry['benchmark']}[{case.name}]", entry["results"]))
+        return flat
+
+    current, previous = index(report), index(baseline)
+    return [
+        f"{key}: {(current[key] - previous[key]) / previous[key]:+.1%}"
+        for key in current
+        if key in previous and previous[key]
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--depth", type=int, nargs="+", default=[0, 2])
+    parser.add_argument("--mix", choices=list(MIXES), nargs="+", default=["all"])
+    parser.add_argument("--benchmark", choices=list(BENCHMARKS), nargs="+", default=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout)
+    parser.add_argument("--baseline", type=argparse.FileType("r"))
+    args = parser.parse_args(argv)
+
+    cases = [Case(w, d, m) for w in args.width for d in args.depth for m in args.mix]
+    report = run(cases, args.benchmark, args.repeat)
+    json.dump(report, args.output, indent=2)
+    args.output.write("\n")
+    if args.baseline is not None:
+        for line in compare(report, json.load(args.baseline)):
+            print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
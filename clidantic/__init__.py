@@ -1,5 +1,22 @@
-from clidantic.core import Parser
-from clidantic.fields import CLIField
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from clidantic.core import Parser
+    from clidantic.fields import CLIField
 
 __version__ = "0.1.1"
 __all__ = ["Parser", "CLIField"]
+
+
+def __getattr__(name: str) -> Any:
+    # click and pydantic are only imported when actually required, so that lightweight
+    # modules (e.g. the client shim) can be imported without paying for them.
+    if name == "Parser":
+        from clidantic.core import Parser
+
+        return Parser
+    if name == "CLIField":
+        from clidantic.fields import CLIField
+
+        return CLIField
+    raise AttributeError(f"module 'clidantic' has no attribute '{name}'")
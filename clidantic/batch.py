@@ -0,0 +1,356 @@
+import io
+import json
+import multiprocessing
+import shlex
+import sys
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+import click
+from click.testing import CliRunner
+
+Record = Union[str, Sequence[str]]
+# when set, command callbacks return the validated call instead of executing it
+defer_execution: ContextVar[bool] = ContextVar("defer_execution", default=False)
+# callbacks available in worker processes, indexed by position
+_worker_callbacks: Tuple[Callable, ...] = ()
+
+
+class DeferredCall(NamedTuple):
+    """Callback and validated arguments of a command, ready to be executed elsewhere."""
+
+    callback: Callable
+    args: Tuple[Any, ...]
+
+
+class BatchResult(NamedTuple):
+    """Outcome of a single record executed in batch mode.
+
+    Attributes:
+        index (int): position of the record in the input sequence.
+        args (List[str]): command line arguments of the record.
+        exit_code (int): exit status, as the one returned by a standalone execution.
+        output (str): standard output and error produced while running the record.
+        return_value (Any): value returned by the command callback, if any.
+        exception (Optional[BaseException]): error raised during the execution, if any.
+    """
+
+    index: int
+    args: List[str]
+    exit_code: int
+    output: str
+    return_value: Any = None
+    exception: Optional[BaseException] = None
+
+
+def parse_record(record: Record) -> List[str]:
+    """Transforms a single batch record into a list of arguments.
+    Strings are interpreted as JSON arrays when they start with a bracket, or as shell-like lines otherwise.
+
+    Args:
+        record (Record): JSON line, shell-like line or sequence of arguments.
+
+    Returns:
+        List[str]: arguments to be provided to the command.
+    """
+    if not isinstance(record, str):
+        return [str(arg) for arg in record]
+    line = record.strip()
+    if line.startswith(("[", "{")):
+        args = json.loads(line)
+        assert isinstance(args, list), f"Record '{line}' is not a JSON array"
+        return [str(arg) for arg in args]
+    return shlex.split(line)
+
+
+def read_records(lines: Iterable[str]) -> Iterator[List[str]]:
+    """Reads batch records from a stream of lines, such as an open file, skipping blanks and comments.
+
+    Args:
+        lines (Iterable[str]): lines in JSON-lines or shell-like format.
+
+    Yields:
+        Iterator[List[str]]: arguments for each record.
+    """
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield parse_record(line)
+
+
+def invoke_command(command: click.Command, args: List[str], prog_name: str) -> Tuple[int, Any, Optional[BaseException]]:
+    """Invokes the command with the given arguments, mimicking the standalone mode of click
+    without exiting the interpreter: errors are printed and converted into exit codes.
+
+    Args:
+        command (click.Command): already built click command or group.
+        args (List[str]): command line arguments.
+        prog_name (str): program name shown in usage messages.
+
+    Returns:
+        Tuple[int, Any, Optional[BaseException]]: exit code, callback return value and raised exception, if any.
+    """
+    try:
+        with command.make_context(prog_name, list(args)) as ctx:
+            return 0, command.invoke(ctx), None
+    except click.exceptions.Exit as exc:
+        return exc.exit_code, None, None
+    except click.ClickException as exc:
+        exc.show()
+        return exc.exit_code, None, exc
+    except click.Abort as exc:
+        click.echo("Aborted!", err=True)
+        return 1, None, exc
+    except SystemExit as exc:
+        code = exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+        return code, None, exc if code else None
+    except Exception as exc:
+        return 1, None, exc
+
+
+def _invoke_isolated(
+    runner: CliRunner, command: click.Command, args: List[str], prog_name: str
+) -> Tuple[int, str, Any, Optional[BaseException]]:
+    with runner.isolation() as streams:
+        exit_code, return_value, exception = invoke_command(command, args, prog_name)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        output = streams[0].getvalue().decode(runner.charset, "replace")
+    return exit_code, output, return_value, exception
+
+
+def run_batch(
+    command: click.Command, records: Iterable[Record], prog_name: Optional[str] = None
+) -> Iterator[BatchResult]:
+    """Runs every record through the same command, capturing the output of each execution separately.
+
+    Args:
+        command (click.Command): already built click command or group.
+        records (Iterable[Record]): sequence of records, see `parse_record`.
+        prog_name (Optional[str], optional): program name shown in usage messages. Defaults to the command name.
+
+    Yields:
+        Iterator[BatchResult]: one result for each record, in input order.
+    """
+    runner = CliRunner()
+    prog_name = prog_name or command.name or "root"
+    for index, record in enumerate(records):
+        args = parse_record(record)
+        exit_code, output, return_value, exception = _invoke_isolated(runner, command, args, prog_name)
+        yield BatchResult(index, args, exit_code, output, return_value, exception)
+
+
+class ThreadLocalStream:
+    """Text stream proxy redirecting writes to a buffer specific to the current thread, when set,
+    or to the original stream otherwise. Installed as `sys.stdout` and `sys.stderr` in thread mode."""
+
+    _local = threading.local()
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+
+    @property
+    def target(self) -> TextIO:
+        return getattr(self._local, "buffer", None) or self._stream
+
+    def write(self, text: str) -> int:
+        return self.target.write(text)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+    def isatty(self) -> bool:
+        return self.target.isatty()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.target, name)
+
+
+@contextmanager
+def capture_threads() -> Iterator[None]:
+    """Installs thread-local proxies as standard output and error, restoring the original streams on exit."""
+    if isinstance(sys.stdout, ThreadLocalStream):
+        yield
+        return
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = ThreadLocalStream(stdout), ThreadLocalStream(stderr)
+    try:
+        yield
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+
+
+def _invoke_threaded(command: click.Command, index: int, args: List[str], prog_name: str) -> BatchResult:
+    buffer = io.StringIO()
+    ThreadLocalStream._local.buffer = buffer
+    try:
+        exit_code, return_value, exception = invoke_command(command, args, prog_name)
+    finally:
+        ThreadLocalStream._local.buffer = None
+    return BatchResult(index, args, exit_code, buffer.getvalue(), return_value, exception)
+
+
+def run_batch_threads(
+    command: click.Command,
+    records: Iterable[Record],
+    jobs: int,
+    ordered: bool = True,
+    prog_name: Optional[str] = None,
+) -> Iterator[BatchResult]:
+    """Runs every record through the same command in a pool of threads, suited to I/O-bound callbacks.
+    Each thread parses, validates and executes its own records: the output is captured per record by replacing
+    the standard streams with thread-local proxies for the duration of the batch. Records are consumed
+    lazily, keeping at most twice the number of threads in flight.
+
+    Args:
+        command (click.Command): already built click command or group.
+        records (Iterable[Record]): sequence of records, see `parse_record`.
+        jobs (int): number of threads.
+        ordered (bool, optional): yields results in input order, otherwise as soon as they complete.
+                                  Defaults to True.
+        prog_name (Optional[str], optional): program name shown in usage messages. Defaults to the command name.
+
+    Yields:
+        Iterator[BatchResult]: one result for each record.
+    """
+    prog_name = prog_name or command.name or "root"
+    limit = 2 * jobs
+    with capture_threads(), ThreadPoolExecutor(jobs) as pool:
+        in_flight: Deque[Future] = deque()
+        for index, record in enumerate(records):
+            args = parse_record(record)
+            in_flight.append(pool.submit(_invoke_threaded, command, index, args, prog_name))
+            if len(in_flight) >= limit:
+                yield from _collect(in_flight, ordered)
+        while in_flight:
+            yield from _collect(in_flight, ordered)
+
+
+def _collect(in_flight: Deque[Future], ordered: bool) -> Iterator[BatchResult]:
+    # waits for the oldest task, or for any task when the order does not matter
+    if ordered:
+        yield in_flight.popleft().result()
+        return
+    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+    for future in [f for f in in_flight if f in done]:
+        in_flight.remove(future)
+        yield future.result()
+
+
+def _init_worker(callbacks: Tuple[Callable, ...]) -> None:
+    global _worker_callbacks
+    _worker_callbacks = callbacks
+
+
+def _run_deferred(slot: int, args: Tuple[Any, ...]) -> Tuple[int, str, Any, Optional[BaseException]]:
+    buffer = io.StringIO()
+    exit_code, return_value, exception = 0, None, None
+    with redirect_stdout(buffer), redirect_stderr(buffer):
+        try:
+            return_value = _worker_callbacks[slot](*args)
+        except click.exceptions.Exit as exc:
+            exit_code = exc.exit_code
+        except click.ClickException as exc:
+            exc.show()
+            exit_code, exception = exc.exit_code, exc
+        except SystemExit as exc:
+            exit_code = exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+            exception = exc if exit_code else None
+        except Exception as exc:
+            exit_code, exception = 1, exc
+    return exit_code, buffer.getvalue(), return_value, exception
+
+
+def _complete(result: BatchResult, future: Optional[Future]) -> BatchResult:
+    # merges the outcome of the deferred callback, when executed, into the validation result
+    if future is None:
+        return result
+    try:
+        exit_code, output, return_value, exception = future.result()
+    except Exception as exc:
+        exit_code, output, return_value, exception = 1, "", None, exc
+    return result._replace(
+        exit_code=exit_code, output=result.output + output, return_value=return_value, exception=exception
+    )
+
+
+def run_batch_processes(
+    command: click.Command,
+    records: Iterable[Record],
+    jobs: int,
+    mp_context: str = "fork",
+    prog_name: Optional[str] = None,
+) -> Iterator[BatchResult]:
+    """Runs every record through the same command, executing callbacks in a pool of worker processes.
+    Arguments are parsed and validated in the current process, then the resulting models are sent to workers,
+    which receive the callbacks when started: with the 'fork' method, callbacks do not need to be picklable.
+    Return values and exceptions raised by callbacks must be picklable instead. Records are consumed lazily,
+    keeping at most twice the number of workers in flight; a callback not seen before waits for the pending
+    records and restarts the pool, so that new workers receive it.
+
+    Args:
+        command (click.Command): already built click command or group.
+        records (Iterable[Record]): sequence of records, see `parse_record`.
+        jobs (int): number of worker processes.
+        mp_context (str, optional): multiprocessing start method. Defaults to "fork".
+        prog_name (Optional[str], optional): program name shown in usage messages. Defaults to the command name.
+
+    Yields:
+        Iterator[BatchResult]: one result for each record, in input order.
+    """
+    runner = CliRunner()
+    prog_name = prog_name or command.name or "root"
+    context = multiprocessing.get_context(mp_context)
+    limit = 2 * jobs
+    slots: Dict[Callable, int] = {}
+    pool: Optional[ProcessPoolExecutor] = None
+    in_flight: Deque[Tuple[BatchResult, Optional[Future]]] = deque()
+    try:
+        for index, record in enumerate(records):
+            args = parse_record(record)
+            # the variable is only set while validating, the caller context is restored before yielding
+            token = defer_execution.set(True)
+            try:
+                exit_code, output, return_value, exception = _invoke_isolated(runner, command, args, prog_name)
+            finally:
+                defer_execution.reset(token)
+            result = BatchResult(index, args, exit_code, output, return_value, exception)
+            future = None
+            if isinstance(return_value, DeferredCall):
+                if return_value.callback not in slots:
+                    while in_flight:
+                        yield _complete(*in_flight.popleft())
+                    if pool is not None:
+                        pool.shutdown()
+                    slots[return_value.callback] = len(slots)
+                    initargs = (tuple(slots),)
+                    pool = ProcessPoolExecutor(jobs, mp_context=context, initializer=_init_worker, initargs=initargs)
+                assert pool is not None
+                future = pool.submit(_run_deferred, slots[return_value.callback], return_value.args)
+                result = result._replace(return_value=None)
+            in_flight.append((result, future))
+            if len(in_flight) >= limit:
+                yield _complete(*in_flight.popleft())
+        while in_flight:
+            yield _complete(*in_flight.popleft())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
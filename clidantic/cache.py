@@ -0,0 +1,379 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Set, Type, Union
+
+import click
+from click import types as click_types
+from pydantic import BaseModel
+from pydantic.utils import lenient_issubclass
+
+from clidantic.convert import OptionSpec, PydanticOption, settings_to_specs
+from clidantic.inputs import loads
+from clidantic.lazy import import_reference
+from clidantic.types import BytesType, EnumChoice, JsonType, LiteralChoice, ModuleType
+
+CACHE_VERSION = 3
+PRIMITIVE_TYPES = {
+    click_types.StringParamType: "str",
+    click_types.IntParamType: "int",
+    click_types.FloatParamType: "float",
+    click_types.BoolParamType: "bool",
+    click_types.UUIDParameterType: "uuid",
+}
+# primitive types are stateless, loaded options share the same instances
+PRIMITIVE_NAMES = {v: k() for k, v in PRIMITIVE_TYPES.items()}
+
+
+class NotCacheable(Exception):
+    """Raised when an option cannot be serialized, e.g. with defaults or types without a JSON representation."""
+
+
+def cache_dir() -> Path:
+    """Returns the directory where clidantic stores its cache files.
+    The location can be customized with the `CLIDANTIC_CACHE_DIR` variable, otherwise it follows the XDG spec.
+
+    Returns:
+        Path: path to the cache directory, not necessarily existing.
+    """
+    if "CLIDANTIC_CACHE_DIR" in os.environ:
+        return Path(os.environ["CLIDANTIC_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "clidantic"
+
+
+def _describe_model(model: Type[BaseModel]) -> List[Any]:
+    description = []
+    for field in model.__fields__.values():
+        if lenient_issubclass(field.outer_type_, BaseModel):
+            description.append((field.name, _describe_model(field.outer_type_)))
+            continue
+        field_info = field.field_info
+        # enum members are not part of their representation
+        members = list(field.outer_type_.__members__) if lenient_issubclass(field.outer_type_, Enum) else None
+        description.append(
+            (
+                field.name,
+                repr(field.outer_type_),
+                members,
+                field.required,
+                repr(field.default),
+                field_info.description,
+                repr(sorted(field_info.extra.items())),
+            )
+        )
+    return description
+
+
+def model_fingerprint(model: Type[BaseModel]) -> str:
+    """Computes a hash of the model schema, as seen by clidantic: any change in names, types, defaults or
+    descriptions of the fields (nested models included) results in a different fingerprint.
+
+    Args:
+        model (Type[BaseModel]): pydantic model definition.
+
+    Returns:
+        str: hex digest representing the current model.
+    """
+    content = repr((CACHE_VERSION, model.__module__, model.__qualname__, _describe_model(model)))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def model_sources(model: Type[BaseModel], sources: Optional[Set[str]] = None) -> Set[str]:
+    """Collects the source files defining the given model, its parent and nested models and the types of its
+    fields, such as enumerations declared in other modules.
+
+    Args:
+        model (Type[BaseModel]): pydantic model definition.
+        sources (Optional[Set[str]], optional): paths collected so far, updated in place. Defaults to None.
+
+    Returns:
+        Set[str]: absolute paths of the source files.
+    """
+    sources = set() if sources is None else sources
+    _collect_sources(model, sources, set())
+    return sources
+
+
+def _collect_sources(annotation: Any, sources: Set[str], visited: Set[Any]) -> None:
+    if not isinstance(annotation, type) or annotation in visited:
+        return
+    visited.add(annotation)
+    module = sys.modules.get(annotation.__module__)
+    if getattr(module, "__file__", None):
+        sources.add(os.path.abspath(module.__file__))
+    if not lenient_issubclass(annotation, BaseModel):
+        return
+    # fields inherited from parent models may be declared in other modules
+    for base in annotation.__mro__[1:]:
+        if base is not BaseModel and lenient_issubclass(base, BaseModel):
+            _collect_sources(base, sources, visited)
+    fields = list(annotation.__fields__.values())
+    while fields:
+        field = fields.pop()
+        _collect_sources(field.outer_type_, sources, visited)
+        _collect_sources(field.type_, sources, visited)
+        fields.extend(field.sub_fields or ())
+
+
+def source_stamps(paths: Set[str]) -> Dict[str, List[int]]:
+    """Reads modification time and size of the given files, skipping the missing ones.
+
+    Args:
+        paths (Set[str]): absolute paths of the source files.
+
+    Returns:
+        Dict[str, List[int]]: modification time in nanoseconds and size in bytes, indexed by path.
+    """
+    stamps: Dict[str, List[int]] = {}
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stamps[path] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def stamps_changed(stamps: Dict[str, List[int]]) -> bool:
+    """Checks whether any of the files changed since their stamps were taken, see `source_stamps`.
+
+    Args:
+        stamps (Dict[str, List[int]]): modification times and sizes, indexed by path.
+
+    Returns:
+        bool: true when a file is missing or has been modified.
+    """
+    for path, (mtime, size) in stamps.items():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return True
+        if stat.st_mtime_ns != mtime or stat.st_size != size:
+            return True
+    return False
+
+
+def is_importable(model: Type[BaseModel]) -> bool:
+    """Checks whether the model can be found in its module under its qualified name. Models created inside
+    functions or with `create_model` are not defined in a source file: their fields may change from one
+    execution to the other without any file being modified.
+
+    Args:
+        model (Type[BaseModel]): pydantic model definition.
+
+    Returns:
+        bool: true when the model is reachable from its module.
+    """
+    target: Any = sys.modules.get(model.__module__)
+    for part in model.__qualname__.split("."):
+        target = getattr(target, part, None)
+    return target is model
+
+
+def _dump_type(param_type: click.ParamType) -> Any:
+    if type(param_type) in PRIMITIVE_TYPES:
+        return PRIMITIVE_TYPES[type(param_type)]
+    if isinstance(param_type, LiteralChoice):
+        return {"kind": "literal", "values": list(param_type.mapping.values())}
+    if isinstance(param_type, EnumChoice):
+        reference = f"{param_type.mapping.__module__}:{param_type.mapping.__qualname__}"
+        if "<locals>" in reference:
+            raise NotCacheable(f"Enum '{reference}' cannot be imported")
+        return {"kind": "enum", "reference": reference}
+    if isinstance(param_type, JsonType):
+        return {"kind": "json", "should_load": param_type.should_load}
+    if isinstance(param_type, BytesType):
+        return {"kind": "bytes"}
+    if isinstance(param_type, ModuleType):
+        return {"kind": "module", "lazy": param_type.lazy}
+    if isinstance(param_type, click.Tuple):
+        return {"kind": "tuple", "types": [_dump_type(t) for t in param_type.types]}
+    raise NotCacheable(f"Type '{param_type}' cannot be serialized")
+
+
+def _load_type(data: Any) -> Any:
+    if isinstance(data, str):
+        return PRIMITIVE_NAMES[data]
+    kind = data["kind"]
+    if kind == "literal":
+        return LiteralChoice(enum=Literal[tuple(data["values"])], case_sensitive=True)
+    if kind == "enum":
+        return EnumChoice(enum=import_reference(data["reference"]), case_sensitive=True)
+    if kind == "json":
+        return JsonType(should_load=data["should_load"])
+    if kind == "bytes":
+        return BytesType()
+    if kind == "module":
+        return ModuleType(lazy=data.get("lazy", False))
+    return click.Tuple([_load_type(t) for t in data["types"]])
+
+
+def _check_json(value: Any) -> Any:
+    serializable = list(value) if isinstance(value, tuple) else value
+    try:
+        restored = json.loads(json.dumps(serializable))
+    except (TypeError, ValueError):
+        raise NotCacheable(f"Default value '{value}' cannot be serialized")
+    if restored != serializable or type(restored) is not type(serializable):
+        raise NotCacheable(f"Default value '{value}' changes after serialization")
+    # cache files may be decoded by orjson, which turns larger integers into floats
+    items = serializable if isinstance(serializable, list) else [serializable]
+    if any(isinstance(item, int) and not -(2**63) <= item < 2**64 for item in items):
+        raise NotCacheable(f"Default value '{value}' exceeds 64 bits")
+    return serializable
+
+
+def dump_option(option: Union[PydanticOption, OptionSpec]) -> Dict[str, Any]:
+    """Serializes the given option into a JSON-compatible dictionary.
+
+    Args:
+        option (Union[PydanticOption, OptionSpec]): option generated from a pydantic field, or its spec.
+
+    Raises:
+        NotCacheable: when the option contains non-serializable information.
+
+    Returns:
+        Dict[str, Any]: dictionary containing every argument required to recreate the option.
+    """
+    if option.item_field is not None:
+        raise NotCacheable(f"Option '{option.name}' is streamed")
+    if isinstance(option, OptionSpec):
+        declarations = list(option.declarations)
+    else:
+        if len(option.secondary_opts) > 1:
+            raise NotCacheable(f"Option '{option.name}' has more than one secondary flag")
+        declarations = [option.name, *option.opts]
+        if option.secondary_opts:
+            declarations[1] = f"{declarations[1]}/{option.secondary_opts[0]}"
+    return {
+        "declarations": declarations,
+        "type": _dump_type(option.type),
+        "required": option.required,
+        "default": _check_json(option.default),
+        "show_default": option.show_default,
+        "multiple": option.multiple,
+        "help": option.help,
+        "path": list(option.path),
+    }
+
+
+def load_spec(data: Dict[str, Any]) -> OptionSpec:
+    """Recreates an option spec from its serialized version.
+
+    Args:
+        data (Dict[str, Any]): dictionary created by `dump_option`.
+
+    Returns:
+        OptionSpec: the equivalent option spec.
+    """
+    default = data["default"]
+    if data["multiple"] and default is not None:
+        default = tuple(default)
+    return OptionSpec(
+        data["declarations"],
+        type=_load_type(data["type"]),
+        required=data["required"],
+        default=default,
+        show_default=data["show_default"],
+        multiple=data["multiple"],
+        help=data["help"],
+        path=tuple(data["path"]),
+    )
+
+
+def load_option(data: Dict[str, Any]) -> PydanticOption:
+    """Recreates an option from its serialized version.
+
+    Args:
+        data (Dict[str, Any]): dictionary created by `dump_option`.
+
+    Returns:
+        PydanticOption: the equivalent click option.
+    """
+    return load_spec(data).materialize()
+
+
+def write_json(path: Union[str, Path], content: Any) -> None:
+    """Atomically writes the given content as JSON, so that concurrent readers never see partial files.
+
+    Args:
+        path (Union[str, Path]): destination file, parent directories are created if required.
+        content (Any): JSON-compatible content.
+
+    Raises:
+        OSError: when the file cannot be written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(content, file)
+    os.replace(temp_path, path)
+
+
+def cached_settings_to_specs(
+    model: Type[BaseModel], delimiter: str, internal_delimiter: str, directory: Optional[Path] = None
+) -> List[OptionSpec]:
+    """Same as `settings_to_specs`, but the result is stored on disk and reused in subsequent executions.
+    Entries of models defined in source files are valid as long as modification times and sizes of those files
+    do not change, other models are checked against their fingerprint. Non-serializable models are not cached:
+    the entry only records it, so that subsequent executions build the options directly.
+
+    Args:
+        model (Type[BaseModel]): pydantic model definition
+        delimiter (str): delimiter to use at cli level
+        internal_delimiter (str): delimiter to use to generate internal identifiers
+        directory (Optional[Path], optional): cache location. Defaults to the user cache dir.
+
+    Returns:
+        List[OptionSpec]: list of option specs, one per primitive field.
+    """
+    directory = directory or cache_dir()
+    key = f"{CACHE_VERSION}|{model.__module__}:{model.__qualname__}|{delimiter}|{internal_delimiter}"
+    path = directory / "options" / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+    importable = is_importable(model)
+    fingerprint = None if importable else model_fingerprint(model)
+    try:
+        with open(path, "rb") as file:
+            content = loads(file.read())
+        if content["fingerprint"] == fingerprint and not stamps_changed(content["sources"]):
+            if content["options"] is None:
+                return list(settings_to_specs(model, delimiter, internal_delimiter))
+            return [load_spec(data) for data in content["options"]]
+    except Exception:
+        pass
+    # missing, outdated or corrupted entry: rebuild and store
+    sources = source_stamps(model_sources(model)) if importable else {}
+    specs = list(settings_to_specs(model, delimiter, internal_delimiter))
+    try:
+        options: Optional[List[Dict[str, Any]]] = [dump_option(spec) for spec in specs]
+    except NotCacheable:
+        options = None
+    try:
+        write_json(path, {"fingerprint": fingerprint, "sources": sources, "options": options})
+    except OSError:
+        pass
+    return specs
+
+
+def cached_settings_to_options(
+    model: Type[BaseModel], delimiter: str, internal_delimiter: str, directory: Optional[Path] = None
+) -> List[click.Option]:
+    """Same as `settings_to_options`, but the result is stored on disk and reused in subsequent executions,
+    see `cached_settings_to_specs` for the validation of the entries.
+
+    Args:
+        model (Type[BaseModel]): pydantic model definition
+        delimiter (str): delimiter to use at cli level
+        internal_delimiter (str): delimiter to use to generate internal identifiers
+        directory (Optional[Path], optional): cache location. Defaults to the user cache dir.
+
+    Returns:
+        List[click.Option]: list of click options, one per primitive field.
+    """
+    return [spec.materialize() for spec in cached_settings_to_specs(model, delimiter, internal_delimiter, directory)]
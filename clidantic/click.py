@@ -7,53 +7,103 @@ https://github.com/samuelcolvin/pydantic/issues/756#issuecomment-798779264.
 Credits to Frederik Aalund <https://github.com/frederikaalund> for his valuable suggestions.
 """
 
-import inspect
+import collections.abc
 import json
 import typing as types
 from enum import Enum
+from functools import lru_cache
 
 from click import ParamType
 from pydantic import BaseModel
 from pydantic.types import Json, JsonWrapper
 from pydantic.utils import lenient_issubclass
 
-from clidantic.types import BytesType, EnumChoice, JsonType, LiteralChoice, ModuleType
+from clidantic.types import BytesType, EnumChoice, JsonType, LazyImport, LiteralChoice, ModuleType, object_path
 
 
-def parse_type(field_type: type) -> ParamType:
-    """Transforms the pydantic field's type into a click-compatible type.
-
-    Args:
-        field_type (type): pydantic field type
+class TypeInfo(types.NamedTuple):
+    """Classification of a pydantic field type, computed once per distinct type.
 
-    Returns:
-        ParamType: click type equivalent
+    Attributes:
+        kind (str): category of the type, e.g. 'enum', 'container' or 'primitive'.
+        param_type (types.Any): click-compatible type, or tuple of types for composite containers.
+        multiple (bool): whether the option can be provided multiple times.
+        container_args (types.Any): click-compatible arguments of container types, none otherwise.
+        name (str): name of the type, used for display purposes.
     """
+
+    kind: str
+    param_type: types.Any
+    multiple: bool
+    container_args: types.Any
+    name: str
+
+
+def _classify_type(field_type: type) -> TypeInfo:
     assert types.get_origin(field_type) is not types.Union, "Unions are not supported"
+    name = getattr(field_type, "__name__", repr(field_type))
     # enumeration strings or other Enum derivatives
     if lenient_issubclass(field_type, Enum):
-        return EnumChoice(enum=field_type, case_sensitive=True)
+        return TypeInfo("enum", EnumChoice(enum=field_type, case_sensitive=True), False, None, name)
     # literals are enum-like with way less functionality
     if is_literal(field_type):
-        return LiteralChoice(enum=field_type, case_sensitive=True)
-    # modules, classes, functions
+        return TypeInfo("literal", LiteralChoice(enum=field_type, case_sensitive=True), False, None, name)
+    # modules, classes, functions: imported during conversion, or on first use for lazy references
+    if lenient_issubclass(field_type, LazyImport):
+        return TypeInfo("lazy", ModuleType(lazy=True), False, None, name)
     if is_typing(field_type):
-        return ModuleType()
+        return TypeInfo("typing", ModuleType(), False, None, name)
     # entire dictionaries:
     # case 1: using pydantic's field, do not convert beforehand
     if lenient_issubclass(field_type, (Json, JsonWrapper)):
-        return JsonType(should_load=False)
+        return TypeInfo("json", JsonType(should_load=False), False, None, name)
     # case 2: using a Dict, convert in advance
     if is_mapping(field_type):
-        return JsonType()
+        return TypeInfo("mapping", JsonType(), False, None, get_type_name(field_type))
     # list, List[p], Tuple[p], Set[p] and so on
+    # A non-composite type has a single argument, such as 'List[int]'
+    # A composite type has a tuple of arguments, like 'Tuple[str, int, int]'.
+    # For the moment, only non-composite types allow for multiple values.
     if is_container(field_type):
-        return parse_container_args(field_type)
+        args = parse_container_args(field_type)
+        return TypeInfo("container", args, not isinstance(args, tuple), args, get_type_name(field_type))
     # bytes are not natively supported by click
     if lenient_issubclass(field_type, bytes):
-        return BytesType()
+        return TypeInfo("bytes", BytesType(), False, None, name)
     # return the current type: it should be a primitive
-    return field_type
+    return TypeInfo("primitive", field_type, False, None, name)
+
+
+_classify_cached = lru_cache(maxsize=None)(_classify_type)
+
+
+def classify_type(field_type: type) -> TypeInfo:
+    """Classifies the given pydantic field type, returning every information required to build an option.
+    Results are cached by type, so that models sharing the same types only pay for the inspection once.
+
+    Args:
+        field_type (type): pydantic field type
+
+    Returns:
+        TypeInfo: classification record for the given type.
+    """
+    try:
+        return _classify_cached(field_type)
+    except TypeError:
+        # unhashable types (e.g. annotations with mutable metadata) are not cached
+        return _classify_type(field_type)
+
+
+def parse_type(field_type: type) -> ParamType:
+    """Transforms the pydantic field's type into a click-compatible type.
+
+    Args:
+        field_type (type): pydantic field type
+
+    Returns:
+        ParamType: click type equivalent
+    """
+    return classify_type(field_type).param_type
 
 
 def parse_default(default: types.Any, field_type: type) -> types.Any:
@@ -69,18 +119,18 @@ def parse_default(default: types.Any, field_type: type) -> types.Any:
     # pydantic uses none and ..., click only supports none
     if default in (None, Ellipsis):
         return None
+    kind = classify_type(field_type).kind
     # for enums we return the name as default
-    if lenient_issubclass(field_type, Enum):
+    if kind == "enum":
         return default.name
-    # for modules and such, the name is returned
-    if is_typing(field_type):
-        module_name = inspect.getmodule(default).__name__
-        return f"{module_name}.{default.__name__}"
+    # for modules and such, the dotted path is returned
+    if kind in ("typing", "lazy"):
+        return default if isinstance(default, str) else object_path(default)
     # for dictionary types, the default is transformed into string
-    if is_mapping(field_type):
+    if kind == "mapping":
         return json.dumps(default)
     # for container types, the origin is required
-    if is_container(field_type):
+    if kind == "container":
         return parse_container_default(default)
     return default
 
@@ -96,9 +146,9 @@ def should_show_default(default: types.Any, field_type: type) -> types.Union[boo
         types.Union[bool, str]: string for containers, or true for the rest
     """
     # include an 'empty <type>' instead of blank spots
-    if is_container(field_type) and not default:
-        name = get_type_name(field_type)
-        return f"empty {name}"
+    info = classify_type(field_type)
+    if info.kind in ("container", "mapping") and not default:
+        return f"empty {info.name}"
     # For non-containers, we always show the default, returning 'True' triggers click.
     return True
 
@@ -114,17 +164,8 @@ def allows_multiple(field_type: type) -> bool:
     Returns:
         bool: true if it's a composite field (lists, containers and so on), false otherwise
     """
-    # Early out for mappings, since it's better to deal with them using strings.
-    if is_mapping(field_type):
-        return False
-    # Activate multiple option for (simple) container types
-    if is_container(field_type):
-        args = parse_container_args(field_type)
-        # A non-composite type has a single argument, such as 'List[int]'
-        # A composite type has a tuple of arguments, like 'Tuple[str, int, int]'.
-        # For the moment, only non-composite types are allowed.
-        return not isinstance(args, tuple)
-    return False
+    # Mappings are not considered multiple, since it's better to deal with them using strings.
+    return classify_type(field_type).multiple
 
 
 def is_literal(field_type: type) -> bool:
@@ -181,7 +222,8 @@ def is_container(field_type: type) -> bool:
     # Early out for non-typing objects
     if origin is None:
         return False
-    return lenient_issubclass(origin, types.Container)
+    # generic iterables are considered containers as well, e.g. for streamed fields
+    return lenient_issubclass(origin, types.Container) or origin is collections.abc.Iterable
 
 
 def is_typing(field_type: type) -> bool:
@@ -242,8 +284,13 @@ def parse_single_arg(arg: type) -> ParamType:
     if arg is types.Any:
         return str
     # For containers and nested models, we use JSON
-    if is_container(arg) or issubclass(arg, BaseModel):
+    if is_container(arg) or lenient_issubclass(arg, BaseModel):
         return JsonType()
+    # For classes and other objects, we import them (or defer it for lazy references)
+    if lenient_issubclass(arg, LazyImport):
+        return ModuleType(lazy=True)
+    if is_typing(arg):
+        return ModuleType()
     if lenient_issubclass(arg, bytes):
         return BytesType()
     return arg
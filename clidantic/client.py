@@ -0,0 +1,93 @@
+"""
+Minimal client for CLIs served by `Parser.serve`.
+The client only depends on the standard library, so that its start-up time is negligible: arguments, environment,
+working directory and the standard streams (as file descriptors) are forwarded to the server, which executes the
+command and returns its exit code.
+
+Usage: `python -m clidantic.client SOCKET_PATH [ARGS]...`, or set `CLIDANTIC_SOCKET` and omit the path.
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+from typing import List, Mapping, Optional, Sequence
+
+HEADER = struct.Struct("!I")
+EXIT_CODE = struct.Struct("!i")
+MAX_FDS = 3
+
+
+def receive_exactly(connection: socket.socket, size: int) -> bytes:
+    """Reads exactly the given amount of bytes from the connection.
+
+    Args:
+        connection (socket.socket): connected socket.
+        size (int): number of bytes to read.
+
+    Raises:
+        ConnectionError: when the connection is closed before receiving everything.
+
+    Returns:
+        bytes: received data.
+    """
+    chunks: List[bytes] = []
+    while size > 0:
+        chunk = connection.recv(size)
+        if not chunk:
+            raise ConnectionError("Connection closed by the other side")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send(
+    socket_path: str,
+    args: Sequence[str],
+    env: Optional[Mapping[str, str]] = None,
+    cwd: Optional[str] = None,
+    fds: Sequence[int] = (0, 1, 2),
+) -> int:
+    """Forwards a command line to the server listening on the given socket and waits for its completion.
+
+    Args:
+        socket_path (str): path to the Unix socket of the server.
+        args (Sequence[str]): command line arguments, without program name.
+        env (Optional[Mapping[str, str]], optional): environment of the command. Defaults to the current one.
+        cwd (Optional[str], optional): working directory of the command. Defaults to the current one.
+        fds (Sequence[int], optional): file descriptors for stdin, stdout and stderr. Defaults to (0, 1, 2).
+
+    Returns:
+        int: exit code of the command.
+    """
+    payload = json.dumps(
+        {
+            "args": list(args),
+            "env": dict(os.environ if env is None else env),
+            "cwd": cwd or os.getcwd(),
+        }
+    ).encode("utf-8")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        socket.send_fds(connection, [HEADER.pack(len(payload))], list(fds))
+        connection.sendall(payload)
+        (exit_code,) = EXIT_CODE.unpack(receive_exactly(connection, EXIT_CODE.size))
+    return exit_code
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    socket_path = os.environ.get("CLIDANTIC_SOCKET")
+    if socket_path is None:
+        if not argv:
+            sys.exit("Usage: python -m clidantic.client SOCKET_PATH [ARGS]...")
+        socket_path, argv = argv[0], argv[1:]
+    try:
+        sys.exit(send(socket_path, argv))
+    except OSError as exc:
+        sys.exit(f"Cannot reach the server at '{socket_path}': {exc}")
+
+
+if __name__ == "__main__":
+    main()
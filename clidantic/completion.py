@@ -0,0 +1,137 @@
+"""
+Shell completion answered from a static index, generated by `clidantic.index`.
+The handler only depends on the standard library and never imports the CLI itself, so that completions are
+instantaneous regardless of the size of the command tree.
+
+Usage with bash: `complete -o default -C 'python -m clidantic.completion INDEX_PATH' PROG`, or print the line
+with `python -m clidantic.completion --bash PROG INDEX_PATH`.
+"""
+
+import json
+import os
+import shlex
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+Node = Dict[str, Any]
+
+
+def load_index(path: str) -> Dict[str, Any]:
+    """Reads a completion index from disk.
+
+    Args:
+        path (str): path to the JSON index.
+
+    Returns:
+        Dict[str, Any]: index content.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def is_stale(index: Dict[str, Any]) -> bool:
+    """Checks whether any of the source files of the CLI changed since the index was generated.
+
+    Args:
+        index (Dict[str, Any]): index content.
+
+    Returns:
+        bool: true when a source file is missing or has been modified.
+    """
+    for path, mtime in index.get("sources", {}).items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+def split_line(line: str) -> Tuple[List[str], str]:
+    """Splits a partial command line into complete words and the word being completed.
+
+    Args:
+        line (str): command line up to the cursor.
+
+    Returns:
+        Tuple[List[str], str]: complete words, program name included, and the incomplete word.
+    """
+    lexer = shlex.shlex(line, posix=True)
+    lexer.whitespace_split = True
+    words: List[str] = []
+    try:
+        for word in lexer:
+            words.append(word)
+    except ValueError:
+        # unterminated quotes: the last word is the incomplete one
+        words.append(lexer.token)
+        return words[:-1], words[-1]
+    if not line or line[-1].isspace() or not words:
+        return words, ""
+    return words[:-1], words[-1]
+
+
+def _option(node: Node, word: str) -> Optional[Dict[str, Any]]:
+    return node["options"].get(word.split("=", maxsplit=1)[0])
+
+
+def complete(index: Dict[str, Any], words: List[str], incomplete: str) -> List[str]:
+    """Computes the completion candidates for the given command line.
+
+    Args:
+        index (Dict[str, Any]): index content.
+        words (List[str]): complete words, program name included.
+        incomplete (str): partial word under the cursor, possibly empty.
+
+    Returns:
+        List[str]: candidates starting with the incomplete word.
+    """
+    node: Node = index["root"]
+    expecting: Optional[Dict[str, Any]] = None
+    # follow subcommands, skipping option values
+    for word in words[1:]:
+        if expecting is not None:
+            expecting = None
+            continue
+        if word.startswith("-"):
+            option = _option(node, word)
+            if option is not None and not option["flag"] and "=" not in word:
+                expecting = option
+        elif word in node["commands"]:
+            node = node["commands"][word]
+    # values of the previous option
+    if expecting is not None:
+        return [choice for choice in expecting["choices"] or () if choice.startswith(incomplete)]
+    if incomplete.startswith("-"):
+        if "=" in incomplete:
+            name, _, value = incomplete.partition("=")
+            option = _option(node, name) or {"choices": None}
+            return [f"{name}={c}" for c in option["choices"] or () if c.startswith(value)]
+        return sorted(name for name in node["options"] if name.startswith(incomplete))
+    return sorted(name for name in node["commands"] if name.startswith(incomplete))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--bash"]:
+        if len(argv) != 3:
+            sys.exit("Usage: python -m clidantic.completion --bash PROG INDEX_PATH")
+        handler = f"{shlex.quote(sys.executable)} -m clidantic.completion {shlex.quote(os.path.abspath(argv[2]))}"
+        print(f"complete -o default -C {shlex.quote(handler)} {argv[1]}")
+        return
+    if not argv:
+        sys.exit("Usage: python -m clidantic.completion INDEX_PATH")
+    # bash provides the line and the cursor position through the environment
+    line = os.environ.get("COMP_LINE", "")
+    point = int(os.environ.get("COMP_POINT", len(line)))
+    try:
+        index = load_index(argv[0])
+    except (OSError, ValueError):
+        return
+    words, incomplete = split_line(line[:point])
+    for candidate in complete(index, words, incomplete):
+        print(candidate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Configuration files, loaded through a dedicated option and merged below the command line arguments.
+JSON is always supported, TOML requires Python 3.11+ or `tomli`, YAML requires `PyYAML`.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import click
+from click import Context, Parameter
+
+from clidantic import inputs
+
+# name of the parameter collecting the configuration files
+CONFIG_PARAM = "clidantic_config"
+
+# parsed files, indexed by absolute path, stored with modification time and size
+_FILE_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+_FILE_CACHE_LOCK = threading.Lock()
+
+
+def _load_json(content: bytes) -> Any:
+    return inputs.loads(content)
+
+
+def _load_toml(content: bytes) -> Any:
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ImportError("TOML files require Python 3.11+ or the 'tomli' package")
+    return tomllib.loads(content.decode("utf-8"))
+
+
+def _load_yaml(content: bytes) -> Any:
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("YAML files require the 'PyYAML' package")
+    # the C loader is considerably faster, when available
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(content, Loader=loader)
+
+
+LOADERS: Dict[str, Callable[[bytes], Any]] = {
+    ".json": _load_json,
+    ".toml": _load_toml,
+    ".yaml": _load_yaml,
+    ".yml": _load_yaml,
+}
+
+
+def load_config_file(path: str) -> Dict[str, Any]:
+    """Parses the given configuration file, choosing the format from its extension.
+    Results are cached until the modification time or the size of the file changes, so that repeated
+    invocations within the same process (e.g. batch or server mode) only parse each file once.
+    The returned dictionary is shared among calls and must not be modified.
+
+    Args:
+        path (str): path to a JSON, TOML or YAML file.
+
+    Raises:
+        ValueError: when the format is not supported or the file does not contain a mapping.
+        ImportError: when the parser required for the format is not installed.
+        OSError: when the file cannot be read.
+
+    Returns:
+        Dict[str, Any]: nested dictionary of settings, keyed by field name.
+    """
+    path = os.path.abspath(path)
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in LOADERS:
+        raise ValueError(f"unsupported format '{extension}', expected one of {', '.join(LOADERS)}")
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _FILE_CACHE.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with open(path, "rb") as file:
+        content = LOADERS[extension](file.read())
+    # empty documents are considered empty configurations
+    content = {} if content is None else content
+    if not isinstance(content, dict):
+        raise ValueError("the file does not contain a mapping")
+    with _FILE_CACHE_LOCK:
+        _FILE_CACHE[path] = (version, content)
+    return content
+
+
+def clear_config_cache() -> None:
+    """Clears the cache of parsed configuration files."""
+    with _FILE_CACHE_LOCK:
+        _FILE_CACHE.clear()
+
+
+def merge_settings(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merges two nested dictionaries, without modifying them.
+    Nested dictionaries are merged key by key, any other value in `override` replaces the one in `base`.
+
+    Args:
+        base (Dict[str, Any]): lower priority settings.
+        override (Dict[str, Any]): higher priority settings.
+
+    Returns:
+        Dict[str, Any]: new merged dictionary.
+    """
+    result = dict(base)
+    for key, value in override.items():
+        current = result.get(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            value = merge_settings(current, value)
+        result[key] = value
+    return result
+
+
+class ConfigFileType(click.Path):
+    """Click type reading a configuration file into a dictionary."""
+
+    name = "file"
+
+    def __init__(self) -> None:
+        super().__init__(exists=True, dir_okay=False, readable=True)
+
+    def convert(self, value: Any, param: Optional[Parameter], ctx: Optional[Context]) -> Any:
+        if isinstance(value, dict):
+            return value
+        path = super().convert(value, param, ctx)
+        try:
+            return load_config_file(path)
+        except Exception as exc:
+            self.fail(f"'{path}' is not a valid configuration file ({str(exc)})", param, ctx)
+
+
+def config_option(declaration: str) -> click.Option:
+    """Creates the option collecting configuration files, repeatable to provide multiple layers.
+
+    Args:
+        declaration (str): option name, e.g. '--config'.
+
+    Returns:
+        click.Option: option storing the parsed files, in the order they were provided.
+    """
+    return click.Option(
+        [declaration, CONFIG_PARAM],
+        type=ConfigFileType(),
+        multiple=True,
+        help="Configuration file (JSON, TOML or YAML), merged in order. Command line options take precedence.",
+    )
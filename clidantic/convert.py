@@ -1,41 +1,217 @@
-from collections import defaultdict
-from typing import Any, DefaultDict, Dict, Iterable, Tuple
+import os
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple, Type
 
 import click
-from pydantic import BaseModel
-from pydantic.fields import ModelField
+from click.core import ParameterSource
+from pydantic import BaseModel, ValidationError
+from pydantic.fields import SHAPE_ITERABLE, ModelField
 from pydantic.utils import lenient_issubclass
 
-from clidantic.click import allows_multiple, parse_default, parse_type, should_show_default
+from clidantic.click import classify_type, parse_default, should_show_default
+from clidantic.inputs import expand_values
+from clidantic.types import original_type
+
+# sources of values explicitly provided by the user
+SPECIFIED_SOURCES = frozenset((ParameterSource.COMMANDLINE, ParameterSource.ENVIRONMENT))
+# context metadata storing the environment variables, filtered by prefix
+ENVIRONMENT_KEY = "clidantic.environment"
 
 
 class PydanticOption(click.Option):
     """Click option converting a pydantic field into a click-compatible format."""
 
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        *args: Any,
+        path: Optional[Tuple[str, ...]] = None,
+        item_field: Optional[ModelField] = None,
+        **kwargs: Any,
+    ) -> None:
         super().__init__(*args, **kwargs, callback=allow_if_specified)
-        self.specified = False
+        # field names from the root model to the current field
+        self.path = path or (self.name,)
+        # pydantic field validating single items, for streamed options
+        self.item_field = item_field
+        # prefix of the environment variables bound to options, see `bind_environment`
+        self.env_prefix: Optional[str] = None
+
+    def resolve_envvar_value(self, ctx: click.Context) -> Optional[str]:
+        if self.env_prefix is None:
+            return super().resolve_envvar_value(ctx)
+        # empty variables are treated as unset, falling back to the automatic prefix as click does,
+        # without looking up the bound variable again
+        value = environment_table(ctx, self.env_prefix).get(self.envvar)
+        if value:
+            return value
+        if self.allow_from_autoenv and ctx.auto_envvar_prefix is not None and self.name is not None:
+            return os.environ.get(f"{ctx.auto_envvar_prefix}_{self.name.upper()}") or None
+        return None
+
+    def type_cast_value(self, ctx: click.Context, value: Any) -> Any:
+        # only values given by the user can refer to files, defaults are taken literally
+        expand = value is not None and is_specified(ctx, self.name)
+        # streamed values are converted and validated while iterating
+        if self.item_field is not None and value is not None:
+            return self._stream_values(ctx, value, expand)
+        # multiple values can be read from files or from the standard input as well
+        if self.multiple and expand:
+            try:
+                value = tuple(expand_values(value))
+            except (OSError, ValueError) as exc:
+                raise click.BadParameter(f"values cannot be read ({str(exc)})", ctx=ctx, param=self)
+        return super().type_cast_value(ctx, value)
 
-    def handle_parse_result(self, context: Any, options: Any, args: Any) -> Any:
-        self.specified = self.name in options
-        return super().handle_parse_result(context, options, args)
+    def _stream_values(self, ctx: click.Context, values: Iterable[Any], expand: bool) -> Iterator[Any]:
+        try:
+            for raw in expand_values(values) if expand else values:
+                value, errors = self.item_field.validate(self.type(raw, self, ctx), {}, loc=self.name)
+                if errors:
+                    messages = [error["msg"] for error in ValidationError([errors], BaseModel).errors()]
+                    raise click.BadParameter(f"'{raw}': {', '.join(messages)}", ctx=ctx, param=self)
+                yield value
+        except (OSError, ValueError) as exc:
+            raise click.BadParameter(f"values cannot be read ({str(exc)})", ctx=ctx, param=self)
 
     @classmethod
-    def from_field(cls, field: ModelField, params: Tuple[str, str]):
+    def from_field(cls, field: ModelField, params: Tuple[str, str], path: Optional[Tuple[str, ...]] = None):
+        return OptionSpec.from_field(field, params, path=path).materialize(option_class=cls)
+
+
+class OptionSpec:
+    """Compact description of an option generated from a pydantic field, holding only the arguments required
+    to create the actual `PydanticOption` on demand. Click options carry dozens of attributes each, while specs
+    only store a handful of slots: models with thousands of fields are kept in this form until parsing or help.
+    """
+
+    __slots__ = (
+        "declarations",
+        "type",
+        "required",
+        "default",
+        "show_default",
+        "multiple",
+        "help",
+        "path",
+        "item_field",
+        "envvar",
+        "env_prefix",
+    )
+
+    def __init__(
+        self,
+        declarations: Sequence[str],
+        type: Any,
+        required: bool = False,
+        default: Any = None,
+        show_default: Any = None,
+        multiple: bool = False,
+        help: Optional[str] = None,
+        path: Optional[Tuple[str, ...]] = None,
+        item_field: Optional[ModelField] = None,
+    ) -> None:
+        # identifier first, then option names, as accepted by click
+        self.declarations = tuple(declarations)
+        # python types are converted once, as click would do for every option
+        if type is not None and not isinstance(type, click.ParamType):
+            type = click.types.convert_type(type, default)
+        self.type = type
+        self.required = required
+        self.default = default
+        self.show_default = show_default
+        self.multiple = multiple
+        self.help = help
+        self.path = path or (self.declarations[0],)
+        self.item_field = item_field
+        self.envvar: Optional[str] = None
+        self.env_prefix: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return self.declarations[0]
+
+    @classmethod
+    def from_field(
+        cls, field: ModelField, params: Tuple[str, str], path: Optional[Tuple[str, ...]] = None
+    ) -> "OptionSpec":
         assert not lenient_issubclass(field.outer_type_, BaseModel)
-        click_type = parse_type(field.outer_type_)
+        # classification results are shared among fields with the same type
+        type_info = classify_type(field.outer_type_)
         default_value = parse_default(field.default, field.outer_type_)
         show_default = should_show_default(field.default, field.outer_type_)
-        multiple = allows_multiple(field.outer_type_)
+        # items of streamed fields are validated one by one, since pydantic does not consume iterables
+        item_field = None
+        if field.field_info.extra.get("stream", False):
+            assert field.shape == SHAPE_ITERABLE, f"Streamed field '{field.name}' must be an Iterable"
+            item_field = field.sub_fields[0]
         return cls(
             params,
-            type=click_type,
+            type=type_info.param_type,
             required=field.required,
             default=default_value,
             show_default=show_default,
-            multiple=multiple,
+            multiple=type_info.multiple,
             help=field.field_info.description,
+            path=path,
+            item_field=item_field,
+        )
+
+    def materialize(self, option_class: Type[PydanticOption] = PydanticOption) -> PydanticOption:
+        """Creates the click option described by this spec.
+
+        Args:
+            option_class (Type[PydanticOption], optional): class of the option. Defaults to PydanticOption.
+
+        Returns:
+            PydanticOption: a new option, independent from any other created by the same spec.
+        """
+        option = option_class(
+            self.declarations,
+            type=self.type,
+            required=self.required,
+            default=self.default,
+            show_default=self.show_default,
+            multiple=self.multiple,
+            help=self.help,
+            path=self.path,
+            item_field=self.item_field,
         )
+        if self.env_prefix is not None:
+            option.envvar = self.envvar
+            option.env_prefix = self.env_prefix
+        return option
+
+
+def environment_table(ctx: click.Context, prefix: str) -> Dict[str, str]:
+    """Returns the environment variables starting with the given prefix.
+    The environment is scanned once per invocation and prefix, results are stored in the context metadata,
+    shared by every option of the invocation.
+
+    Args:
+        ctx (click.Context): current click context.
+        prefix (str): prefix of the variables, e.g. 'APP_'.
+
+    Returns:
+        Dict[str, str]: variables starting with the prefix, with their values.
+    """
+    tables = ctx.meta.setdefault(ENVIRONMENT_KEY, {})
+    table = tables.get(prefix)
+    if table is None:
+        table = tables[prefix] = {k: v for k, v in os.environ.items() if k.startswith(prefix)}
+    return table
+
+
+def bind_environment(params: Iterable[click.Parameter], prefix: str) -> None:
+    """Binds each option generated from a pydantic field to an environment variable, named after the
+    option identifier with the given prefix, e.g. `--example.test-attribute` becomes `APP_EXAMPLE__TEST_ATTRIBUTE`.
+
+    Args:
+        params (Iterable[click.Parameter]): options generated by `settings_to_options`, or their specs.
+        prefix (str): prefix of the environment variables.
+    """
+    for param in params:
+        if isinstance(param, (PydanticOption, OptionSpec)):
+            param.envvar = f"{prefix}{param.name.upper()}"
+            param.env_prefix = prefix
 
 
 def allow_if_specified(context: click.Context, param: click.Parameter, value: Any) -> Any:
@@ -51,10 +227,51 @@ def allow_if_specified(context: click.Context, param: click.Parameter, value: An
         Any: returns value if it has been explicitly defined by the user
     """
     if isinstance(param, PydanticOption):
-        return value if param.specified else None
+        return value if is_specified(context, param.name) else None
     return value
 
 
+def is_specified(context: click.Context, name: str) -> bool:
+    """Checks whether the given parameter has been explicitly provided in the current invocation,
+    either on the command line or through the environment. The information is stored in the context
+    rather than in the option, so that the same command can be invoked concurrently.
+
+    Args:
+        context (click.Context): context of the current invocation.
+        name (str): name of the parameter.
+
+    Returns:
+        bool: true when the value does not come from defaults, false otherwise.
+    """
+    return context.get_parameter_source(name) in SPECIFIED_SOURCES
+
+
+def check_raw_values(ctx: click.Context, settings: Dict[str, Any]) -> None:
+    """Converts the specified values of pass-through options with their original click types, so that invalid
+    values are reported exactly as click would do, after pydantic failed to validate them. See `raw_type`.
+
+    Args:
+        ctx (click.Context): context of the current invocation.
+        settings (Dict[str, Any]): nested settings, as passed to the model.
+
+    Raises:
+        click.BadParameter: when click would have rejected one of the values.
+    """
+    for param in ctx.command.get_params(ctx):
+        if not isinstance(param, PydanticOption) or param.item_field is not None or not is_specified(ctx, param.name):
+            continue
+        converter = original_type(param.type)
+        if converter is param.type:
+            continue
+        value: Any = settings
+        for part in param.path:
+            value = value.get(part) if isinstance(value, dict) else None
+        if value is None:
+            continue
+        for item in value if param.multiple else (value,):
+            converter(item, param, ctx)
+
+
 def param_from_field(
     field: ModelField, kebab_name: str, delimiter: str, internal_delimiter: str, parent_path: Tuple[str, ...]
 ) -> Tuple[str, str]:
@@ -84,10 +301,14 @@ def param_from_field(
     return identifier, full_option_name, *extra_names
 
 
-def settings_to_options(
-    model: BaseModel, delimiter: str, internal_delimiter: str, parent_path: Tuple[str, ...] = tuple()
-) -> Iterable[click.Option]:
-    """Recursively transforms the given model fields into click Options.
+def settings_to_specs(
+    model: BaseModel,
+    delimiter: str,
+    internal_delimiter: str,
+    parent_path: Tuple[str, ...] = tuple(),
+    field_path: Tuple[str, ...] = tuple(),
+) -> Iterable[OptionSpec]:
+    """Recursively transforms the given model fields into option specs, see `OptionSpec`.
     Composite fields will be split into single primitive types with a full identifier.
 
     Args:
@@ -95,12 +316,13 @@ def settings_to_options(
         delimiter (str): delimiter to use at cli level
         internal_delimiter (str): delimiter to use to generate internal identifiers
         parent_path (Tuple[str, ...], optional): full path from root to the current model. Defaults to tuple().
+        field_path (Tuple[str, ...], optional): field names from root to the current model. Defaults to tuple().
 
     Returns:
-        Iterable[Option]: generator of click Options
+        Iterable[OptionSpec]: generator of option specs
 
     Yields:
-        Iterator[Iterable[Option]]: a single click Option
+        Iterator[Iterable[OptionSpec]]: a single option spec
     """
     # iterate over fields in the settings
     for field in model.__fields__.values():
@@ -108,38 +330,97 @@ def settings_to_options(
         kebab_name = field.name.replace("_", "-")
         assert internal_delimiter not in kebab_name
         if lenient_issubclass(field.outer_type_, BaseModel):
-            yield from settings_to_options(
-                field.outer_type_, delimiter, internal_delimiter, parent_path=parent_path + (kebab_name,)
+            yield from settings_to_specs(
+                field.outer_type_,
+                delimiter,
+                internal_delimiter,
+                parent_path=parent_path + (kebab_name,),
+                field_path=field_path + (field.name,),
             )
             continue
         # simple fields
         params = param_from_field(field, kebab_name, delimiter, internal_delimiter, parent_path)
-        yield PydanticOption.from_field(field, params)
+        yield OptionSpec.from_field(field, params, path=field_path + (field.name,))
+
+
+def settings_to_options(
+    model: BaseModel,
+    delimiter: str,
+    internal_delimiter: str,
+    parent_path: Tuple[str, ...] = tuple(),
+    field_path: Tuple[str, ...] = tuple(),
+) -> Iterable[click.Option]:
+    """Recursively transforms the given model fields into click Options.
+    Composite fields will be split into single primitive types with a full identifier.
+
+    Args:
+        model (BaseModel): pydantic model definition
+        delimiter (str): delimiter to use at cli level
+        internal_delimiter (str): delimiter to use to generate internal identifiers
+        parent_path (Tuple[str, ...], optional): full path from root to the current model. Defaults to tuple().
+        field_path (Tuple[str, ...], optional): field names from root to the current model. Defaults to tuple().
+
+    Returns:
+        Iterable[Option]: generator of click Options
+
+    Yields:
+        Iterator[Iterable[Option]]: a single click Option
+    """
+    for spec in settings_to_specs(model, delimiter, internal_delimiter, parent_path=parent_path, field_path=field_path):
+        yield spec.materialize()
+
+
+def settings_paths(options: Iterable[click.Parameter]) -> Dict[str, Tuple[Tuple[str, ...], str]]:
+    """Precomputes the location of each option value inside the nested settings dictionary.
+    The table is computed once per command, so that no identifier needs to be split at every invocation.
+
+    Args:
+        options (Iterable[click.Parameter]): options generated by `settings_to_options`, or their specs.
+
+    Returns:
+        Dict[str, Tuple[Tuple[str, ...], str]]: mapping from identifier to parent keys and final key.
+    """
+    return {
+        option.name: (option.path[:-1], option.path[-1])
+        for option in options
+        if isinstance(option, (PydanticOption, OptionSpec))
+    }
 
 
-def kwargs_to_settings(kwargs: Dict[str, Any], internal_delimiter: str) -> Dict[str, Any]:
+def kwargs_to_settings(
+    kwargs: Dict[str, Any], internal_delimiter: str, paths: Optional[Dict[str, Tuple[Tuple[str, ...], str]]] = None
+) -> Dict[str, Any]:
     """Transforms a flat dictionary of identifiers and values back into a complex object made of nested dictionaries.
     E.g. the following input: `animal__type='dog', animal__name='roger', animal__owner__name='Mark'`
-    becomes: `{animal: {name: 'roger', type: 'dog'}, owner: {name: 'Mark'}}`
+    becomes: `{animal: {name: 'roger', type: 'dog', owner: {name: 'Mark'}}}`
 
     Args:
         kwargs (Dict[str, Any]): flat dictionary of available fields
         internal_delimiter (str): delimiter required to split fields
+        paths (Optional[Dict[str, Tuple[Tuple[str, ...], str]]], optional): precomputed table of locations,
+            as returned by `settings_paths`. Identifiers not in the table are split. Defaults to None.
 
     Returns:
         Dict[str, Any]: nested dictionary of properties to be converted into pydantic models
     """
-    result: DefaultDict[str, Any] = defaultdict(dict)
+    paths = paths or {}
+    result: Dict[str, Any] = {}
     for name, value in kwargs.items():
         # skip when not set
         if value is None:
             continue
-        # split full name into parts
-        parts = name.split(internal_delimiter)
+        # use the precomputed location, or split full name into parts
+        if name in paths:
+            parents, key = paths[name]
+        else:
+            *parents, key = name.split(internal_delimiter)
         # create nested dicts corresponding to each part
         # test__inner__value -> {test: {inner: value}}
         nested = result
-        for part in parts[:-1]:
-            nested = nested[part]
-        nested[parts[-1]] = value
-    return dict(result)
+        for part in parents:
+            child = nested.get(part)
+            if child is None:
+                child = nested[part] = {}
+            nested = child
+        nested[key] = value
+    return result
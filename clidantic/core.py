@@ -1,45 +1,309 @@
 import inspect
-from functools import update_wrapper
-from typing import Any, Callable, List, Optional, Tuple, Type, Union
+import os
+import sys
+from functools import partial, update_wrapper
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union
 
 import click
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from pydantic.utils import lenient_issubclass
 
-from clidantic.convert import kwargs_to_settings, settings_to_options
+from clidantic.batch import (
+    BatchResult,
+    DeferredCall,
+    Record,
+    defer_execution,
+    run_batch,
+    run_batch_processes,
+    run_batch_threads,
+)
+from clidantic.cache import cached_settings_to_specs
+from clidantic.config import CONFIG_PARAM, config_option, merge_settings
+from clidantic.convert import (
+    OptionSpec,
+    bind_environment,
+    check_raw_values,
+    kwargs_to_settings,
+    settings_paths,
+    settings_to_specs,
+)
+from clidantic.fastparse import SETTINGS_PARAM, FastParseCommand
+from clidantic.help import CachedHelpCommand
+from clidantic.index import INDEX_VARIABLE, ensure_completion_index
+from clidantic.lazy import LazyGroup, import_reference, lazy_command_class, reference_name
+from clidantic.loop import synchronize
+from clidantic.profile import extract_profile_flag, profiler
+from clidantic.server import create_server
+from clidantic.types import raw_type
 
 
-def create_callback(callback: Callable, config_class: Type[BaseModel], internal_delimiter: str) -> Callable:
+def create_callback(
+    callback: Callable,
+    config_class: Optional[Type[BaseModel]],
+    internal_delimiter: str,
+    paths: Optional[Dict[str, Tuple[Tuple[str, ...], str]]] = None,
+    config_param: Optional[str] = None,
+    raw_values: bool = False,
+) -> Callable:
     """Creates a callback from the actual callback function provided. This serves as middle step to parse
     the configuration and validate inputs before actually passing it to the function.
 
     Args:
         callback (Callable): function to be called once the configuration is created
-        config_class (Type[BaseModel]): target configuration class, used as factory.
+        config_class (Optional[Type[BaseModel]]): target configuration class, used as factory.
+                                                  When none, the callback is invoked without arguments.
         internal_delimiter (str): delimiter used to identify subfields from click.
+        paths (Optional[Dict[str, Tuple[Tuple[str, ...], str]]], optional): precomputed locations of each option
+            inside the configuration, see `settings_paths`. Defaults to None.
+        config_param (Optional[str], optional): name of the parameter containing parsed configuration files,
+            merged in order below the command line arguments. Defaults to None.
+        raw_values (bool, optional): whether options pass strings through, see `raw_type`. Invalid values are
+            then reported by the original click types, as they would without pass-through. Defaults to False.
 
     Returns:
         Callable: new callback, wrapping the original function to convert click stuff into a configuration.
     """
+    # coroutines are executed on the event loop shared by every command
+    function = synchronize(callback) if inspect.iscoroutinefunction(callback) else callback
 
     def wrapper(**kwargs: Any) -> Any:
-        raw_config = kwargs_to_settings(kwargs, internal_delimiter)
-        instance = config_class(**raw_config)
-        return callback(instance)
+        args: Tuple[BaseModel, ...] = ()
+        if config_class is not None:
+            with profiler.phase("validate", model=config_class.__name__):
+                layers = kwargs.pop(config_param, ()) if config_param else ()
+                # settings may already be nested by the fast parser
+                raw_config = kwargs.pop(SETTINGS_PARAM, None)
+                if raw_config is None:
+                    raw_config = kwargs_to_settings(kwargs, internal_delimiter, paths=paths)
+                # only options explicitly provided are in the raw config, so they override every file
+                for layer in reversed(layers):
+                    raw_config = merge_settings(layer, raw_config)
+                try:
+                    args = (config_class(**raw_config),)
+                except ValidationError:
+                    ctx = click.get_current_context(silent=True)
+                    if raw_values and ctx is not None:
+                        check_raw_values(ctx, raw_config)
+                    raise
+        # in deferred mode, the validated call is returned to be executed elsewhere
+        if defer_execution.get():
+            return DeferredCall(function, args)
+        with profiler.phase("callback", command=callback.__name__):
+            return function(*args)
 
     update_wrapper(wrapper, callback)
+    # exposed for programmatic calls, bypassing click entirely
+    wrapper.config_class = config_class
+    wrapper.function = function
     return wrapper
 
 
+def construct_model(model: Type[BaseModel], values: Dict[str, Any]) -> BaseModel:
+    """Creates a model instance from trusted values without validation, recursively for nested models.
+
+    Args:
+        model (Type[BaseModel]): configuration class.
+        values (Dict[str, Any]): field values, where nested models can be provided as dictionaries.
+
+    Returns:
+        BaseModel: model instance, including defaults for missing fields.
+    """
+    fields = model.__fields__
+    for name, value in values.items():
+        field = fields.get(name)
+        if field is not None and isinstance(value, dict) and lenient_issubclass(field.outer_type_, BaseModel):
+            values = {**values, name: construct_model(field.outer_type_, value)}
+    return model.construct(**values)
+
+
+def validate_fields(model: Type[BaseModel], values: Dict[str, Any]) -> Dict[str, Any]:
+    """Validates the given field values alone, as they would be by the model, without the other fields.
+    Values not matching any field are ignored, as pydantic does by default.
+
+    Args:
+        model (Type[BaseModel]): configuration class.
+        values (Dict[str, Any]): field values, indexed by alias.
+
+    Raises:
+        ValidationError: when any of the values is not valid.
+
+    Returns:
+        Dict[str, Any]: validated values, indexed by field name.
+    """
+    fields = {field.alias: field for field in model.__fields__.values()}
+    validated: Dict[str, Any] = {}
+    errors = []
+    for alias, value in values.items():
+        field = fields.get(alias)
+        if field is None:
+            continue
+        value, error = field.validate(value, validated, loc=field.alias, cls=model)
+        if error:
+            errors.append(error)
+        else:
+            validated[field.name] = value
+    if errors:
+        raise ValidationError(errors, model)
+    return validated
+
+
+class RunnableCommand(FastParseCommand, CachedHelpCommand):
+    """Click command created by `Parser.command`, that can also be executed directly with a configuration,
+    without going through the command line. Help messages are rendered once and cached, arguments can be
+    parsed in a single pass when `fast_parse` is enabled."""
+
+    def run(self, config: Union[BaseModel, Dict[str, Any], None] = None, validate: bool = True, **kwargs: Any) -> Any:
+        """Executes the command function with the given configuration, bypassing argument parsing.
+
+        Args:
+            config (Union[BaseModel, Dict[str, Any], None], optional): model instance, used as it is, or dictionary
+                of field values. Defaults to None.
+            validate (bool, optional): validates dictionaries with the model, otherwise values are trusted and
+                                       the model is constructed directly. Defaults to True.
+            **kwargs (Any): additional field values, merged with the given dictionary or copied into the given
+                            model instance, in which case only these values are validated.
+
+        Returns:
+            Any: value returned by the command function.
+        """
+        callback = self.callback
+        if callback.config_class is None:
+            return callback.function()
+        # model instances are used as they are, only the values updating them are validated
+        if isinstance(config, callback.config_class):
+            if not kwargs:
+                return callback.function(config)
+            if validate:
+                update = validate_fields(callback.config_class, kwargs)
+            else:
+                trusted = construct_model(callback.config_class, kwargs)
+                update = {name: getattr(trusted, name) for name in kwargs if name in callback.config_class.__fields__}
+            return callback.function(config.copy(update=update))
+        values = config.dict() if isinstance(config, BaseModel) else dict(config or {})
+        values.update(kwargs)
+        if validate:
+            return callback.function(callback.config_class(**values))
+        return callback.function(construct_model(callback.config_class, values))
+
+
+_RUNNABLE_CLASSES: Dict[type, Type[RunnableCommand]] = {}
+
+
+def runnable_command_class(command_class: Type[click.Command]) -> Type[RunnableCommand]:
+    """Returns a variant of the given command class supporting direct execution, creating it on first request.
+
+    Args:
+        command_class (Type[click.Command]): click command class or any subclass.
+
+    Returns:
+        Type[RunnableCommand]: command class that combines the `run` method with the given class.
+    """
+    if issubclass(command_class, RunnableCommand):
+        return command_class
+    if command_class not in _RUNNABLE_CLASSES:
+        # the original name is kept, so that the command representation does not change
+        name = command_class.__name__
+        _RUNNABLE_CLASSES[command_class] = type(name, (RunnableCommand, command_class), {})
+    return _RUNNABLE_CLASSES[command_class]
+
+
+def build_command(
+    f: Callable,
+    delimiter: str,
+    internal_delimiter: str,
+    cache: bool = False,
+    config: Optional[str] = None,
+    env_prefix: Optional[str] = None,
+    compact: bool = False,
+    conversion: str = "click",
+) -> Tuple[List[Union[click.Parameter, OptionSpec]], Callable]:
+    """Inspects the given function and creates the click parameters and the callback for its command.
+    This is the expensive part of a command definition, since the whole configuration model is traversed.
+
+    Args:
+        f (Callable): function decorated as command, with at most one pydantic model as argument.
+        delimiter (str): delimiter to be used in the terminal for subfields.
+        internal_delimiter (str): delimiter used by the parser internally.
+        cache (bool, optional): reuses the options stored on disk, when the model did not change. Defaults to False.
+        config (Optional[str], optional): name of the option loading configuration files, if any. Defaults to None.
+        env_prefix (Optional[str], optional): prefix of the environment variables bound to options. Defaults to None.
+        compact (bool, optional): returns option specs instead of click options, see `OptionSpec`. Defaults to False.
+        conversion (str, optional): 'click' converts values with click types before validation, 'pydantic' passes
+                                    strings through when pydantic converts them equally. Defaults to "click".
+
+    Returns:
+        Tuple[List[Union[click.Parameter, OptionSpec]], Callable]: list of click options (or their specs)
+                                                                   and the callback to be invoked.
+    """
+    # extract function parameters and prepare list of click params
+    # empty commands simply wrap the same function
+    with profiler.phase("signature", command=f.__name__):
+        func_arguments = inspect.signature(f, eval_str=True).parameters
+    params: List[Union[click.Parameter, OptionSpec]] = []
+    callback = create_callback(f, config_class=None, internal_delimiter=internal_delimiter)
+    # if we have a configuration, parse it
+    # otherwise handle empty commands
+    if func_arguments:
+        assert len(func_arguments) == 1, "Multi-configuration commands not supported yet"
+        _, config_arg = next(iter(func_arguments.items()))
+        cfg_class = config_arg.annotation
+        assert lenient_issubclass(cfg_class, BaseModel), "Configuration must be a pydantic model"
+        with profiler.phase("options", command=f.__name__, model=cfg_class.__name__, cached=cache):
+            if cache:
+                params = cached_settings_to_specs(cfg_class, delimiter, internal_delimiter)
+            else:
+                params = list(settings_to_specs(cfg_class, delimiter, internal_delimiter))
+            if conversion == "pydantic":
+                for spec in params:
+                    spec.type = raw_type(spec.type)
+            if not compact:
+                params = [spec.materialize() for spec in params]
+        paths = settings_paths(params)
+        if env_prefix is not None:
+            bind_environment(params, env_prefix)
+        # with configuration files, required fields may come from files: pydantic checks them instead of click
+        if config:
+            for param in params:
+                param.required = False
+            params.append(config_option(config))
+        # create a wrapped callback
+        callback = create_callback(
+            f,
+            config_class=cfg_class,
+            internal_delimiter=internal_delimiter,
+            paths=paths,
+            config_param=CONFIG_PARAM if config else None,
+            raw_values=conversion == "pydantic",
+        )
+    return params, callback
+
+
 class Parser:
     """Creates a new CLI building block.
     A parser allows to create a click command or group and allows for composition.
     """
 
-    def __init__(self, name: str = None, subgroups: List["Parser"] = []) -> None:
+    def __init__(
+        self,
+        name: str = None,
+        subgroups: List[Union["Parser", str]] = [],
+        lazy: bool = False,
+        cache: bool = False,
+        completion_index: Optional[str] = None,
+        compact: bool = False,
+        fast_parse: bool = False,
+        conversion: str = "click",
+    ) -> None:
+        assert conversion in ("click", "pydantic"), f"Unknown conversion '{conversion}'"
         self.name = name
+        self.lazy = lazy
+        self.cache = cache
+        self.compact = compact
+        self.fast_parse = fast_parse
+        self.conversion = conversion
+        self.completion_index = completion_index or os.environ.get(INDEX_VARIABLE)
         self.entrypoint: Callable = None
-        self.subgroups: List["Parser"] = list(subgroups)
+        self.subgroups: List[Union["Parser", str]] = list(subgroups)
         self.commands: List[click.Command] = []
 
     def __call__(self, content_width: int = 119) -> Any:
@@ -52,14 +316,145 @@ class Parser:
         Returns:
             Any: doesn't actually return anything at the moment.
         """
-        self._update_entrypoint()
+        args = extract_profile_flag(sys.argv[1:])
+        with profiler.phase("entrypoint", parser=self.name):
+            self._update_entrypoint()
         if not self.entrypoint:
             raise ValueError("CLI not initialized")
-        return self.entrypoint(max_content_width=content_width)
+        if self.completion_index:
+            with profiler.phase("completion", parser=self.name):
+                ensure_completion_index(self.entrypoint, self.completion_index, prog_name=self.name)
+        with profiler.phase("click", parser=self.name):
+            return self.entrypoint(args=args, max_content_width=content_width)
 
     def __repr__(self) -> str:
         return f"<CLI {self.name}>"
 
+    def invoke(self, args: Sequence[str], prog_name: Optional[str] = None) -> Any:
+        """Parses the given arguments and runs the selected command in the current process, without isolating
+        standard streams or environment. The entrypoint is built on the first call and reused afterwards.
+
+        Args:
+            args (Sequence[str]): command line arguments, without program name, e.g. `["train", "--epochs", "1"]`.
+            prog_name (Optional[str], optional): program name shown in usage messages. Defaults to the CLI name.
+
+        Raises:
+            ValueError: when the CLI is not initialized.
+            click.ClickException: when the arguments are not valid.
+            click.exceptions.Exit: when the execution terminates early, e.g. after printing the help.
+
+        Returns:
+            Any: value returned by the command.
+        """
+        entrypoint = self._get_entrypoint()
+        with entrypoint.make_context(prog_name or self.name or entrypoint.name, list(args)) as ctx:
+            return entrypoint.invoke(ctx)
+
+    def call(self, path: Union[str, Sequence[str]], **kwargs: Any) -> Any:
+        """Runs a command with the given configuration values, skipping argument parsing altogether:
+        the values are validated by the configuration model, then passed to the command function.
+
+        Args:
+            path (Union[str, Sequence[str]]): command names from the root, either as sequence or
+                                              separated by spaces, e.g. 'store add'.
+            **kwargs (Any): configuration values, keyed by field name. Nested models accept dictionaries.
+
+        Raises:
+            ValueError: when the CLI is not initialized.
+            click.UsageError: when the command does not exist.
+            pydantic.ValidationError: when the values are not valid.
+
+        Returns:
+            Any: value returned by the command.
+        """
+        return self._resolve_command(path).run(kwargs)
+
+    def _get_entrypoint(self) -> click.Command:
+        if self.entrypoint is None:
+            self._update_entrypoint()
+        if not self.entrypoint:
+            raise ValueError("CLI not initialized")
+        return self.entrypoint
+
+    def _resolve_command(self, path: Union[str, Sequence[str]]) -> click.Command:
+        names = path.split() if isinstance(path, str) else list(path)
+        command = self._get_entrypoint()
+        # single-command CLIs do not have a group: the name is optional
+        if not isinstance(command, click.Group):
+            if names and names != [command.name]:
+                raise click.UsageError(f"No such command '{' '.join(names)}'.")
+            return command
+        for index, name in enumerate(names):
+            if not isinstance(command, click.Group):
+                raise click.UsageError(f"No such command '{' '.join(names[: index + 1])}'.")
+            command = command.get_command(click.Context(command), name)
+            if command is None:
+                raise click.UsageError(f"No such command '{' '.join(names[: index + 1])}'.")
+        if isinstance(command, click.Group):
+            raise click.UsageError(f"'{' '.join(names)}' is a group, not a command.")
+        return command
+
+    def batch(
+        self,
+        records: Iterable[Record],
+        jobs: Optional[int] = None,
+        mp_context: str = "fork",
+        executor: str = "process",
+        ordered: bool = True,
+    ) -> Iterator[BatchResult]:
+        """Runs many argument vectors through the current CLI within the same process.
+        The entrypoint is built only once, then each record is executed in isolation, capturing its output.
+        When more than one job is requested, records are either parsed and validated in the current process,
+        with callbacks executed by a pool of worker processes, or entirely executed by a pool of threads.
+
+        Args:
+            records (Iterable[Record]): argument lists, JSON arrays or shell-like lines, e.g. read from a file
+                                        with `clidantic.batch.read_records`.
+            jobs (Optional[int], optional): number of workers. Defaults to None (same process and thread).
+            mp_context (str, optional): multiprocessing start method for worker processes. Defaults to "fork".
+            executor (str, optional): kind of workers, 'process' or 'thread' (for I/O-bound commands).
+                                      Defaults to "process".
+            ordered (bool, optional): in thread mode, yields results in input order rather than as soon as they
+                                      complete. Defaults to True.
+
+        Raises:
+            ValueError: when the CLI is not initialized or the executor is unknown.
+
+        Returns:
+            Iterator[BatchResult]: lazy sequence of results, one per record.
+        """
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Unknown executor '{executor}', expected 'process' or 'thread'")
+        self._update_entrypoint()
+        if not self.entrypoint:
+            raise ValueError("CLI not initialized")
+        if jobs is not None and jobs > 1:
+            if executor == "thread":
+                return run_batch_threads(self.entrypoint, records, jobs=jobs, ordered=ordered)
+            return run_batch_processes(self.entrypoint, records, jobs=jobs, mp_context=mp_context)
+        return run_batch(self.entrypoint, records)
+
+    def serve(self, socket_path: str, warm: bool = True) -> None:
+        """Keeps the CLI ready in a long-lived process, executing the command lines received on a Unix socket.
+        Every request is executed in a process forked from the server, receiving arguments, environment, working
+        directory and standard streams of the client (see `clidantic.client`). Blocks until interrupted.
+
+        Args:
+            socket_path (str): path where the socket is created.
+            warm (bool, optional): builds every lazy command before serving. Defaults to True.
+
+        Raises:
+            ValueError: when the CLI is not initialized.
+        """
+        self._update_entrypoint()
+        if not self.entrypoint:
+            raise ValueError("CLI not initialized")
+        with create_server(self.entrypoint, socket_path, prog_name=self.name, warm=warm) as server:
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+
     def _group_commands(
         self, force_group: bool = False, create_empty: bool = False
     ) -> Union[click.Command, click.Group]:
@@ -77,14 +472,15 @@ class Parser:
             if not create_empty:
                 return None
             else:
-                return click.Group(name=self.name)
+                return LazyGroup(name=self.name)
         if len(self.commands) == 1 and not force_group:
             return self.commands[0]
-        return click.Group(name=self.name, commands=self.commands)
+        return LazyGroup(name=self.name, commands=self.commands)
 
     def _update_entrypoint(self, force_group: bool = False) -> None:
         """Updates the current entrypoint based on the current stored values.
         The function recursively traverses its subtree to initialize the entrypoint of children CLI first.
+        Subgroups provided as import references are only registered, they are imported when selected.
 
         Args:
             force_group (bool, optional): Forces group creation on the current Parser. Defaults to False.
@@ -94,11 +490,15 @@ class Parser:
         if self.subgroups:
             # first, update sub-clis to get an entrypoint
             for cli in self.subgroups:
-                cli._update_entrypoint(force_group=True)
+                if isinstance(cli, Parser):
+                    cli._update_entrypoint(force_group=True)
             main = self._group_commands(force_group=True, create_empty=True)
             # then add the sub-entrypoints to the current main component
             # those are the sub-groups created in the children CLIs
             for cli in self.subgroups:
+                if isinstance(cli, str):
+                    main.add_lazy_command(reference_name(cli), partial(self._load_subgroup, cli))
+                    continue
                 if cli.entrypoint is None:
                     raise ValueError(f"Subgroup '{cli.name}' does not have any commands.")
                 main.add_command(cli.entrypoint)
@@ -110,6 +510,26 @@ class Parser:
         elif self.commands:
             self.entrypoint = self._group_commands(force_group=force_group)
 
+    @staticmethod
+    def _load_subgroup(reference: str) -> click.Command:
+        """Imports a subgroup provided as reference and initializes its entrypoint.
+
+        Args:
+            reference (str): import path to the Parser instance, e.g. 'myapp.cli.store:store'.
+
+        Raises:
+            ValueError: when the referenced subgroup is not initialized.
+
+        Returns:
+            click.Command: entrypoint of the referenced parser.
+        """
+        cli = import_reference(reference)
+        assert isinstance(cli, Parser), f"Reference '{reference}' is not a Parser instance"
+        cli._update_entrypoint(force_group=True)
+        if cli.entrypoint is None:
+            raise ValueError(f"Subgroup '{reference}' does not have any commands.")
+        return cli.entrypoint
+
     def command(
         self,
         name: Optional[str] = None,
@@ -117,9 +537,13 @@ class Parser:
         command_class: Optional[Type[click.Command]] = click.Command,
         delimiter: str = ".",
         internal_delimiter: str = "__",
+        lazy: Optional[bool] = None,
+        config_option: Optional[str] = None,
+        env_prefix: Optional[str] = None,
     ) -> Callable:
         """Decorator that defines a command function. Commands are just wrappers around click functionalities that use
         Pydantic models as building blocks for options instead of variable arguments.
+        Coroutine functions are also supported: they are executed on a shared event loop (uvloop, if installed).
 
         Args:
             name (Optional[str], optional): name for the command. When none, the function name is used.
@@ -127,9 +551,16 @@ class Parser:
                                                                      Defaults to click.Command.
             delimiter (str, optional): delimiter to be used in the terminal for subfields. Defaults to ".".
             internal_delimiter (str, optional): delimiter used by the parser internally. Defaults to "__".
+            lazy (Optional[bool], optional): builds options and callback only when the command is resolved.
+                                             When none, the Parser setting is used. Defaults to None.
+            config_option (Optional[str], optional): name of a repeatable option loading settings from JSON, TOML
+                                                     or YAML files, e.g. '--config'. Defaults to None.
+            env_prefix (Optional[str], optional): reads options from environment variables with the given prefix,
+                                                  e.g. 'APP_' for 'APP_EXAMPLE__TEST_ATTRIBUTE'. Defaults to None.
 
         Returns:
             Callable: wrapper around the given function that creates a command once called.
+                      Commands can also be executed directly with a configuration, see `RunnableCommand.run`.
         """
         assert (
             internal_delimiter.isidentifier()
@@ -139,39 +570,53 @@ class Parser:
             # create a name or use the provided one
             command_name = name or f.__name__.lower().replace("_", "-")
             command_help = help_message or inspect.getdoc(f)
-            # extract function parameters and prepare list of click params
-            # assign the same function as callback for empty commands
-            func_arguments = inspect.signature(f, eval_str = True).parameters
-            params: List[click.Parameter] = []
-            callback = f
-            # if we have a configuration, parse it
-            # otherwise handle empty commands
-            if func_arguments:
-                assert len(func_arguments) == 1, "Multi-configuration commands not supported yet"
-                _, config_arg = next(iter(func_arguments.items()))
-                cfg_class = config_arg.annotation
-                assert lenient_issubclass(cfg_class, BaseModel), "Configuration must be a pydantic model"
-                params = list(settings_to_options(cfg_class, delimiter, internal_delimiter))
-                # create a wrapped callback
-                callback = create_callback(f, config_class=cfg_class, internal_delimiter=internal_delimiter)
-            command = command_class(
-                name=command_name,
-                callback=callback,
-                params=params,
-                help=command_help,
+            loader = partial(
+                build_command,
+                f,
+                delimiter=delimiter,
+                internal_delimiter=internal_delimiter,
+                cache=self.cache,
+                config=config_option,
+                env_prefix=env_prefix,
+                compact=self.compact,
+                conversion=self.conversion,
             )
+            # lazy commands only store the loader, options are created once the command is resolved
+            # compact commands keep option specs, creating the actual options for each invocation
+            is_lazy = self.lazy if lazy is None else lazy
+            if is_lazy or self.compact:
+                lazy_class = runnable_command_class(lazy_command_class(command_class))
+                command = lazy_class(name=command_name, loader=loader, help=command_help)
+                if not is_lazy:
+                    command._materialize()
+            else:
+                params, callback = loader()
+                command = runnable_command_class(command_class)(
+                    name=command_name,
+                    callback=callback,
+                    params=params,
+                    help=command_help,
+                )
+            command.fast_parse = self.fast_parse
+            # rendered help messages are also stored on disk, identified by the function location
+            if self.cache:
+                command.help_cache_key = f"{f.__code__.co_filename}:{f.__qualname__}"
             # add command to current CLI list and return it
             self.commands.append(command)
+            # the entrypoint is rebuilt on the next invocation, to include the new command
+            self.entrypoint = None
             return command
 
         return decorator
 
     @classmethod
-    def merge(cls, *subgroups: Tuple["Parser", ...], name: Optional[str] = None) -> "Parser":
+    def merge(cls, *subgroups: Tuple[Union["Parser", str], ...], name: Optional[str] = None) -> "Parser":
         """Class method that merges a variable list of parsers into a single one.
+        Parsers can also be provided as import references, such as 'myapp.cli.store:store': in this case,
+        the module is only imported when the subgroup is selected, and its name is given by the attribute.
 
         Args:
-            subgroups (Tuple[Parser,...]): variable sequence of CLI blocks (at least 2).
+            subgroups (Tuple[Union[Parser, str],...]): variable sequence of CLI blocks (at least 2).
             name (Optional[str], optional): name for the merged group. When none, the default CLI name is used.
 
         Returns:
@@ -179,6 +624,7 @@ class Parser:
         """
         assert subgroups is not None and len(subgroups) > 1, "Provide at least two Parsers to merge"
         assert all(
-            hasattr(cli, "name") and cli.name is not None for cli in subgroups
+            reference_name(cli) if isinstance(cli, str) else (hasattr(cli, "name") and cli.name is not None)
+            for cli in subgroups
         ), "Nested parsers must have a name"
         return cls(name=name, subgroups=subgroups)
@@ -0,0 +1,165 @@
+"""
+Single-pass argument parsing for commands made only of options generated from pydantic models.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+from click.core import ParameterSource
+
+from clidantic.convert import PydanticOption
+from clidantic.inputs import FILE_PREFIX, STDIN
+
+# parameter passing the nested settings collected by the fast parser to the callback
+SETTINGS_PARAM = "clidantic_settings"
+# marks options expecting a value, instead of flags with a fixed one
+_VALUE = object()
+
+# option name, value set by flags (or `_VALUE`) and number of values
+OptionEntry = Tuple[str, Any, int]
+OptionTable = Dict[str, OptionEntry]
+
+
+def build_option_table(params: List[click.Parameter]) -> Optional[OptionTable]:
+    """Maps every option string to the name of its option and, for boolean flags, to the value it sets.
+    Entries do not reference the options themselves, so that the table can be shared by every invocation,
+    including compact commands creating new options each time.
+
+    Args:
+        params (List[click.Parameter]): parameters of the command, without the help option.
+
+    Returns:
+        Optional[OptionTable]: the lookup table, or none when the parameters are not supported.
+    """
+    table: OptionTable = {}
+    for param in params:
+        if not isinstance(param, PydanticOption) or param.count or (param.is_flag and not param.is_bool_flag):
+            return None
+        for name in param.opts:
+            table[name] = (param.name, True if param.is_flag else _VALUE, param.nargs)
+        for name in param.secondary_opts:
+            table[name] = (param.name, False, param.nargs)
+    return table
+
+
+def _collect(table: OptionTable, args: List[str]) -> Optional[Dict[str, List[Any]]]:
+    # raw values of each specified option, in order; none for anything click should handle
+    values: Dict[str, List[Any]] = {}
+    position = 0
+    while position < len(args):
+        arg = args[position]
+        position += 1
+        name, separator, attached = arg.partition("=") if arg.startswith("--") else (arg, "", "")
+        entry = table.get(name)
+        if entry is None:
+            return None
+        name, flag_value, nargs = entry
+        if flag_value is not _VALUE:
+            if separator:
+                return None
+            value: Any = flag_value
+        elif nargs == 1:
+            if separator:
+                value = attached
+            elif position < len(args):
+                value = args[position]
+                position += 1
+            else:
+                return None
+        else:
+            end = position + nargs
+            if separator or end > len(args):
+                return None
+            value = tuple(args[position:end])
+            position = end
+        values.setdefault(name, []).append(value)
+    return values
+
+
+def _reads_stdin(value: Any) -> bool:
+    # raw values referring to the standard input, possibly among multiple values or tuples
+    if isinstance(value, (list, tuple)):
+        return any(_reads_stdin(item) for item in value)
+    return value in (STDIN, FILE_PREFIX + STDIN)
+
+
+def fast_parse(
+    ctx: click.Context, command: click.Command, table: OptionTable, args: List[str]
+) -> Optional[Dict[str, Any]]:
+    """Parses the arguments in a single pass, collecting values directly into the nested settings dictionary.
+    Values are converted by the options themselves, as click would do, but without going through the generic
+    parser, the parameter processing order and the callbacks.
+
+    Args:
+        ctx (click.Context): context of the current invocation.
+        command (click.Command): command to be invoked, whose options are all `PydanticOption`.
+        table (OptionTable): lookup table of the command options, see `build_option_table`.
+        args (List[str]): command line arguments.
+
+    Returns:
+        Optional[Dict[str, Any]]: nested settings, or none when click should handle the arguments instead,
+                                  e.g. with help requests, unknown or short combined options, invalid values
+                                  or values read from the standard input.
+    """
+    if ctx.resilient_parsing or ctx.default_map or ctx.ignore_unknown_options or ctx.allow_extra_args:
+        return None
+    if not args and command.no_args_is_help:
+        return None
+    collected = _collect(table, args)
+    if collected is None:
+        return None
+    settings: Dict[str, Any] = {}
+    try:
+        for param in command.params:
+            if param.name in collected:
+                raw = collected[param.name]
+                source = ParameterSource.COMMANDLINE
+                value = tuple(raw) if param.multiple else raw[-1]
+            else:
+                value = param.value_from_envvar(ctx) if param.envvar else None
+                if value is None:
+                    # missing required options are reported by click
+                    if param.required:
+                        return None
+                    continue
+                source = ParameterSource.ENVIRONMENT
+            # the standard input can only be read once, click handles it in case of fallback
+            if _reads_stdin(value):
+                return None
+            # the source is set first, as click does: conversions depend on it, e.g. to expand file references
+            ctx.set_parameter_source(param.name, source)
+            value = param.type_cast_value(ctx, value)
+            nested = settings
+            for part in param.path[:-1]:
+                nested = nested.setdefault(part, {})
+            nested[param.path[-1]] = value
+    except click.ClickException:
+        # invalid values are reported by click, with the usual messages
+        return None
+    return settings
+
+
+class FastParseCommand(click.Command):
+    """Click command that can parse its arguments with `fast_parse`, falling back to click for anything
+    not supported. The fast path is disabled by default, see `fast_parse` attribute.
+    """
+
+    # enables the single-pass parser for this command
+    fast_parse: bool = False
+    # stored parameters and their lookup table, rebuilt whenever the parameters change
+    _option_table: Optional[Tuple[List[Any], Optional[OptionTable]]] = None
+
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        if self.fast_parse:
+            params = self.params
+            # compact commands return new options for each invocation, created from the same stored specs
+            stored = getattr(self, "_params", params)
+            if self._option_table is None or self._option_table[0] is not stored:
+                self._option_table = (stored, build_option_table(params))
+            table = self._option_table[1]
+            settings = fast_parse(ctx, self, table, args) if table is not None else None
+            if settings is not None:
+                ctx.params = {SETTINGS_PARAM: settings}
+                ctx.args = []
+                return ctx.args
+        return super().parse_args(ctx, args)
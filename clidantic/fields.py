@@ -29,6 +29,7 @@ def CLIField(
     regex: str = None,
     discriminator: str = None,
     repr: bool = True,
+    stream: bool = False,
     **extra: Any,
 ) -> Any:
     """
@@ -78,9 +79,13 @@ def CLIField(
     :param discriminator: only useful with a (discriminated a.k.a. tagged) `Union` of sub models with a common field.
       The `discriminator` is the name of this common field to shorten validation and improve generated schema
     :param repr: show this field in the representation
+    :param stream: only applies to ``Iterable`` fields, provides the command with a single-pass iterator that
+      reads, converts and validates items one at a time, instead of a fully built collection
     :param **extra: any additional keyword arguments will be added as is to the schema
     """
     extra.update(names=names)
+    if stream:
+        extra.update(stream=True)
     field_info = FieldInfo(
         default,
         default_factory=default_factory,
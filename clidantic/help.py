@@ -0,0 +1,125 @@
+"""
+Help messages rendered once per command and terminal width, then served from memory or from disk.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from threading import RLock
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import click
+
+from clidantic.cache import CACHE_VERSION, cache_dir, model_sources, write_json
+from clidantic.completion import is_stale
+
+HelpEntry = Tuple[str, List[str]]
+
+
+def command_sources(callback: Optional[Any]) -> Dict[str, int]:
+    """Collects the source files defining the given command callback and its configuration models.
+
+    Args:
+        callback (Optional[Any]): command callback, as created by `create_callback`.
+
+    Returns:
+        Dict[str, int]: modification times in nanoseconds, indexed by absolute path.
+    """
+    sources: Set[str] = set()
+    code = getattr(inspect.unwrap(callback), "__code__", None) if callback is not None else None
+    if code is not None:
+        sources.add(os.path.abspath(code.co_filename))
+    config_class = getattr(callback, "config_class", None)
+    if config_class is not None:
+        model_sources(config_class, sources)
+    return {path: os.stat(path).st_mtime_ns for path in sorted(sources) if os.path.exists(path)}
+
+
+class CachedHelpCommand(click.Command):
+    """Click command that renders its help message only once for each command path and content width.
+    Contexts providing their own defaults, through `default_map` or `show_default`, always render it again.
+    Messages are kept in memory and, when the command has a `help_cache_key`, stored on disk together with the
+    modification times of the sources. With a valid entry, `--help` is answered before parsing arguments, so that
+    lazy commands do not even build their options.
+    """
+
+    # identifies the command across processes, disk caching is disabled when missing
+    help_cache_key: Optional[str] = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self._help_cache: Dict[Tuple[str, int], HelpEntry] = {}
+        self._help_lock = RLock()
+        super().__init__(*args, **kwargs)
+
+    def _help_path(self, key: Tuple[str, int]) -> Optional[str]:
+        if self.help_cache_key is None:
+            return None
+        content = repr((CACHE_VERSION, self.help_cache_key) + key)
+        return str(cache_dir() / "help" / f"{hashlib.sha1(content.encode('utf-8')).hexdigest()}.json")
+
+    def _help_key(self, ctx: click.Context) -> Optional[Tuple[str, int]]:
+        # defaults shown in the message can be changed by the context, such messages are always rendered
+        if ctx.default_map or ctx.show_default is not None:
+            return None
+        # the actual width depends on the terminal as well, it is computed by the formatter
+        return ctx.command_path, ctx.make_formatter().width
+
+    def cached_help(self, ctx: click.Context) -> Optional[HelpEntry]:
+        """Retrieves the help message for the given context without rendering it, from memory or from disk.
+
+        Args:
+            ctx (click.Context): context of the current invocation.
+
+        Returns:
+            Optional[HelpEntry]: help message and names of the help option, when available.
+        """
+        key = self._help_key(ctx)
+        if key is None:
+            return None
+        entry = self._help_cache.get(key)
+        path = self._help_path(key)
+        if entry is not None or path is None:
+            return entry
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                content = json.load(file)
+            if is_stale(content):
+                return None
+            entry = (content["help"], content["names"])
+        except Exception:
+            return None
+        with self._help_lock:
+            self._help_cache[key] = entry
+        return entry
+
+    def get_help(self, ctx: click.Context) -> str:
+        entry = self.cached_help(ctx)
+        if entry is not None:
+            return entry[0]
+        key = self._help_key(ctx)
+        text = super().get_help(ctx)
+        if key is None:
+            return text
+        names = self.get_help_option_names(ctx) if self.add_help_option else []
+        entry = (text, sorted(names))
+        with self._help_lock:
+            self._help_cache[key] = entry
+        path = self._help_path(key)
+        if path is not None:
+            content = {"sources": command_sources(self.callback), "help": text, "names": entry[1]}
+            try:
+                write_json(path, content)
+            except OSError:
+                pass
+        return text
+
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        # plain help requests are answered directly, before the parameters are required
+        if args and not ctx.resilient_parsing and self.add_help_option:
+            if all(arg in ctx.help_option_names for arg in args):
+                entry = self.cached_help(ctx)
+                if entry is not None and all(arg in entry[1] for arg in args):
+                    click.echo(entry[0], color=ctx.color)
+                    ctx.exit()
+        return super().parse_args(ctx, args)
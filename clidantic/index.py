@@ -0,0 +1,147 @@
+"""
+Generation of the static completion index used by `clidantic.completion`.
+
+Usage at install time: `python -m clidantic.index myapp.cli:cli INDEX_PATH`.
+"""
+
+import inspect
+import os
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+import click
+
+from clidantic.cache import model_fingerprint, model_sources, write_json
+from clidantic.completion import is_stale, load_index
+from clidantic.lazy import import_reference
+
+if TYPE_CHECKING:
+    from clidantic.core import Parser
+
+INDEX_VERSION = 1
+INDEX_VARIABLE = "CLIDANTIC_COMPLETION_INDEX"
+
+
+def _describe_option(param: click.Option) -> Dict[str, Any]:
+    choices = list(param.type.choices) if isinstance(param.type, click.Choice) else None
+    return {"flag": param.is_flag or param.count, "choices": choices}
+
+
+def _describe_command(
+    command: click.Command, fingerprints: Dict[str, str], sources: Set[str], ctx: click.Context
+) -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    for param in command.get_params(ctx):
+        if not isinstance(param, click.Option):
+            continue
+        for name in param.opts:
+            options[name] = _describe_option(param)
+        # boolean switches also have a negative flag, e.g. '--no-verbose'
+        for name in param.secondary_opts:
+            options[name] = {"flag": True, "choices": None}
+    callback = command.callback
+    if callback is not None:
+        module = sys.modules.get(inspect.unwrap(callback).__module__)
+        if getattr(module, "__file__", None):
+            sources.add(os.path.abspath(module.__file__))
+    config_class = getattr(callback, "config_class", None)
+    if config_class is not None:
+        model_sources(config_class, sources)
+        fingerprints[f"{config_class.__module__}:{config_class.__qualname__}"] = model_fingerprint(config_class)
+    commands: Dict[str, Any] = {}
+    if isinstance(command, click.Group):
+        for name in command.list_commands(ctx):
+            subcommand = command.get_command(ctx, name)
+            if subcommand is not None and not subcommand.hidden:
+                sub_ctx = click.Context(subcommand, parent=ctx, info_name=name)
+                commands[name] = _describe_command(subcommand, fingerprints, sources, sub_ctx)
+    return {"options": options, "commands": commands}
+
+
+def build_completion_index(command: click.Command, prog_name: Optional[str] = None) -> Dict[str, Any]:
+    """Traverses the whole command tree, lazy commands included, collecting everything required for completion:
+    subcommands, option names with their boolean counterparts, and choices of enumerations and literals.
+
+    Args:
+        command (click.Command): root command or group.
+        prog_name (Optional[str], optional): program name. Defaults to the command name.
+
+    Returns:
+        Dict[str, Any]: JSON-compatible index, including model fingerprints and modification times of the sources.
+    """
+    fingerprints: Dict[str, str] = {}
+    sources: Set[str] = set()
+    ctx = click.Context(command, info_name=prog_name or command.name)
+    root = _describe_command(command, fingerprints, sources, ctx)
+    return {
+        "version": INDEX_VERSION,
+        "prog": prog_name or command.name,
+        "fingerprints": fingerprints,
+        "sources": {path: os.stat(path).st_mtime_ns for path in sorted(sources) if os.path.exists(path)},
+        "root": root,
+    }
+
+
+def write_completion_index(command: click.Command, path: str, prog_name: Optional[str] = None) -> Dict[str, Any]:
+    """Builds the completion index of the given command and stores it at the given path.
+
+    Args:
+        command (click.Command): root command or group.
+        path (str): destination of the JSON index.
+        prog_name (Optional[str], optional): program name. Defaults to the command name.
+
+    Returns:
+        Dict[str, Any]: the generated index.
+    """
+    index = build_completion_index(command, prog_name=prog_name)
+    write_json(path, index)
+    return index
+
+
+def ensure_completion_index(command: click.Command, path: str, prog_name: Optional[str] = None) -> bool:
+    """Writes the completion index when missing or outdated. Checking an existing index only requires reading
+    the modification times of the sources: when any of them changed, the index is rebuilt and compared with the
+    previous one, using model fingerprints and the command tree.
+
+    Args:
+        command (click.Command): root command or group.
+        path (str): location of the JSON index.
+        prog_name (Optional[str], optional): program name. Defaults to the command name.
+
+    Returns:
+        bool: true when the content of the index changed, false when it is still valid.
+    """
+    try:
+        current: Optional[Dict[str, Any]] = load_index(path)
+        if current.get("version") == INDEX_VERSION and not is_stale(current):
+            return False
+    except (OSError, ValueError):
+        current = None
+    index = build_completion_index(command, prog_name=prog_name)
+    changed = current is None or not _same_content(current, index)
+    try:
+        # timestamps are refreshed anyway, so that the next check is cheap again
+        write_json(path, index)
+    except OSError:
+        pass
+    return changed
+
+
+def _same_content(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+    keys = ("version", "prog", "fingerprints", "root")
+    return all(first.get(key) == second.get(key) for key in keys)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        sys.exit("Usage: python -m clidantic.index MODULE:PARSER INDEX_PATH")
+    parser: "Parser" = import_reference(argv[0])
+    parser._update_entrypoint()
+    if parser.entrypoint is None:
+        sys.exit(f"'{argv[0]}' does not have any commands")
+    write_completion_index(parser.entrypoint, argv[1], prog_name=parser.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Values read from files or from the standard input, instead of the command line.
+JSON and dictionary fields accept `@path` or `-` (stdin) in place of the inline document, while list fields
+accept `@path` or `@-` among their values, expanded into one item per line (or per element of a `.json` array).
+A leading `@@` escapes values that actually start with `@`.
+"""
+
+import json
+import mmap
+import os
+from typing import IO, Any, Callable, Iterable, Iterator, Optional, Union
+
+import click
+
+FILE_PREFIX = "@"
+STDIN = "-"
+# documents larger than this are memory-mapped instead of read, when the JSON backend supports buffers
+MMAP_THRESHOLD = 1 << 20
+
+try:
+    import orjson
+
+    _fast_loads: Optional[Callable[[Union[str, bytes, memoryview]], Any]] = orjson.loads
+    BUFFER_SUPPORT = True
+except ImportError:
+    _fast_loads = None
+    BUFFER_SUPPORT = False
+
+
+def loads(content: Union[str, bytes, memoryview]) -> Any:
+    """Decodes a JSON document read from a file or from the standard input, using orjson when available.
+    Documents rejected by orjson, e.g. containing `NaN` or `Infinity`, are decoded again by the standard library.
+    Inline values are decoded by the standard library only, which keeps integers of any size.
+
+    Args:
+        content (Union[str, bytes, memoryview]): encoded document.
+
+    Raises:
+        ValueError: when the content is not a valid JSON document.
+
+    Returns:
+        Any: decoded document.
+    """
+    if _fast_loads is not None:
+        try:
+            return _fast_loads(content)
+        except ValueError:
+            pass
+    if isinstance(content, memoryview):
+        content = content.tobytes()
+    return json.loads(content)
+
+
+def is_reference(value: Any) -> bool:
+    """Checks whether the given raw value points to a file or to the standard input.
+
+    Args:
+        value (Any): raw command line value.
+
+    Returns:
+        bool: true for '@path' and '@-' values, false otherwise (including escaped '@@' values).
+    """
+    return isinstance(value, str) and value.startswith(FILE_PREFIX) and not value.startswith(FILE_PREFIX * 2)
+
+
+def unescape(value: Any) -> Any:
+    """Removes the escaping prefix from values starting with '@@'.
+
+    Args:
+        value (Any): raw command line value.
+
+    Returns:
+        Any: the value itself, or without its first character when escaped.
+    """
+    if isinstance(value, str) and value.startswith(FILE_PREFIX * 2):
+        return value[1:]
+    return value
+
+
+def _open(source: str) -> IO[bytes]:
+    if source == STDIN:
+        return click.get_binary_stream("stdin")
+    return open(source, "rb")
+
+
+def read_text(source: str) -> str:
+    """Reads the whole content of the given file or of the standard input, as text.
+
+    Args:
+        source (str): file path, or '-' for the standard input.
+
+    Returns:
+        str: content decoded as UTF-8.
+    """
+    if source == STDIN:
+        return _open(source).read().decode("utf-8")
+    with _open(source) as file:
+        return file.read().decode("utf-8")
+
+
+def load_json(source: str) -> Any:
+    """Decodes a JSON document from the given file or from the standard input.
+    Large files are memory-mapped and decoded without intermediate copies, when the backend allows it.
+
+    Args:
+        source (str): file path, or '-' for the standard input.
+
+    Raises:
+        ValueError: when the content is not a valid JSON document.
+
+    Returns:
+        Any: decoded document.
+    """
+    if source == STDIN:
+        return loads(_open(source).read())
+    with _open(source) as file:
+        size = os.fstat(file.fileno()).st_size
+        if BUFFER_SUPPORT and size >= MMAP_THRESHOLD:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return loads(memoryview(buffer))
+        return loads(file.read())
+
+
+def iter_items(source: str) -> Iterator[Any]:
+    """Lazily reads the items of a list from the given file or from the standard input.
+    Files with '.json' extension must contain a JSON array, every other input is read line by line
+    (e.g. plain text or JSON-lines), skipping empty lines. Lines are returned as strings, so that they
+    go through the same conversion of values provided on the command line.
+
+    Args:
+        source (str): file path, or '-' for the standard input.
+
+    Raises:
+        ValueError: when a '.json' file does not contain an array.
+
+    Yields:
+        Iterator[Any]: raw items, strings or already decoded JSON elements.
+    """
+    if source != STDIN and source.endswith(".json"):
+        document = load_json(source)
+        if not isinstance(document, list):
+            raise ValueError(f"'{source}' does not contain a JSON array")
+        yield from document
+        return
+    file = _open(source)
+    try:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line.decode("utf-8")
+    finally:
+        if source != STDIN:
+            file.close()
+
+
+def expand_values(values: Iterable[Any]) -> Iterator[Any]:
+    """Replaces file and standard input references among the values of a multiple option with their items.
+
+    Args:
+        values (Iterable[Any]): raw values of the option, as collected by click.
+
+    Yields:
+        Iterator[Any]: raw values, with references expanded and escaped values restored.
+    """
+    for value in values:
+        if is_reference(value):
+            yield from iter_items(value[1:])
+        else:
+            yield unescape(value)
@@ -0,0 +1,162 @@
+import importlib
+from threading import RLock
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+import click
+
+CommandLoader = Callable[[], Tuple[List[Any], Optional[Callable]]]
+
+# context metadata storing the parameters created for the current invocation, see `LazyCommand.params`
+PARAMS_KEY = "clidantic.params"
+
+
+class LazyCommand(click.Command):
+    """Click command whose parameters and callback are only built when first required.
+    Help listings in parent groups only need the name and the help string, therefore the (expensive)
+    conversion of the pydantic model into options is delayed until the command is actually resolved.
+
+    The loader can also return compact specs instead of click parameters, i.e. objects with a `materialize`
+    method: in this case, parameters are created for each invocation and released with its context.
+    """
+
+    def __init__(self, *args: Any, loader: CommandLoader, **kwargs: Any) -> None:
+        self._loader = loader
+        self._loaded = False
+        self._compact = False
+        self._lock = RLock()
+        self._params: List[Any] = []
+        self._callback: Optional[Callable] = None
+        super().__init__(*args, **kwargs)
+
+    def _materialize(self) -> None:
+        """Builds parameters and callback using the given loader, only once.
+        Any parameter registered before loading is kept after the generated ones.
+        """
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            params, callback = self._loader()
+            self.params = list(params) + self._params
+            if callback is not None:
+                self._callback = callback
+            self._loaded = True
+
+    def _expand(self) -> List[click.Parameter]:
+        return [param if isinstance(param, click.Parameter) else param.materialize() for param in self._params]
+
+    @property
+    def params(self) -> List[click.Parameter]:
+        self._materialize()
+        if not self._compact:
+            return self._params
+        # parameters are shared by every step of the same invocation, e.g. parsing and help
+        ctx = click.get_current_context(silent=True)
+        if ctx is None or ctx.command is not self:
+            return self._expand()
+        created = ctx.meta.setdefault(PARAMS_KEY, {})
+        if id(self) not in created:
+            created[id(self)] = self._expand()
+        return created[id(self)]
+
+    @params.setter
+    def params(self, value: List[Any]) -> None:
+        self._params = value
+        self._compact = any(not isinstance(param, click.Parameter) for param in value)
+
+    @property
+    def callback(self) -> Optional[Callable]:
+        self._materialize()
+        return self._callback
+
+    @callback.setter
+    def callback(self, value: Optional[Callable]) -> None:
+        self._callback = value
+
+
+_LAZY_CLASSES: Dict[type, Type[LazyCommand]] = {click.Command: LazyCommand}
+
+
+def lazy_command_class(command_class: Type[click.Command]) -> Type[LazyCommand]:
+    """Returns a lazy variant of the given command class, creating it on first request.
+
+    Args:
+        command_class (Type[click.Command]): click command class or any subclass.
+
+    Returns:
+        Type[LazyCommand]: command class that combines laziness with the given class.
+    """
+    assert issubclass(command_class, click.Command), "Only click commands can be loaded lazily"
+    if issubclass(command_class, LazyCommand):
+        return command_class
+    if command_class not in _LAZY_CLASSES:
+        name = f"Lazy{command_class.__name__}"
+        _LAZY_CLASSES[command_class] = type(name, (LazyCommand, command_class), {})
+    return _LAZY_CLASSES[command_class]
+
+
+class LazyGroup(click.Group):
+    """Click group that can also register subcommands through loaders, invoked only when the subcommand
+    is selected from the command line (or listed with its help).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_commands: Dict[str, Callable[[], click.Command]] = {}
+        self._lock = RLock()
+
+    def add_lazy_command(self, name: str, loader: Callable[[], click.Command]) -> None:
+        """Registers a subcommand that will be created by the given loader on first use.
+
+        Args:
+            name (str): name of the subcommand in the command line.
+            loader (Callable[[], click.Command]): function returning the actual command or group.
+        """
+        self.lazy_commands[name] = loader
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(self.commands).union(self.lazy_commands))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            with self._lock:
+                if cmd_name not in self.commands:
+                    self.commands[cmd_name] = self.lazy_commands[cmd_name]()
+        return super().get_command(ctx, cmd_name)
+
+
+def reference_name(reference: str) -> str:
+    """Extracts the command name from an import reference, e.g. 'myapp.cli.store:store' becomes 'store'.
+
+    Args:
+        reference (str): import path in the form 'package.module:attribute'.
+
+    Returns:
+        str: last component of the referenced attribute, with dashes instead of underscores.
+    """
+    module_name, separator, attribute = reference.partition(":")
+    assert separator and module_name and attribute, f"'{reference}' is not a valid 'module:attribute' reference"
+    return attribute.rsplit(".", maxsplit=1)[-1].lower().replace("_", "-")
+
+
+def import_reference(reference: str) -> Any:
+    """Imports the object pointed by the given reference.
+
+    Args:
+        reference (str): import path in the form 'package.module:attribute'.
+
+    Raises:
+        ImportError: when the module does not define the given attribute.
+
+    Returns:
+        Any: the referenced object.
+    """
+    module_name, _, attribute = reference.partition(":")
+    result = importlib.import_module(module_name)
+    try:
+        for part in attribute.split("."):
+            result = getattr(result, part)
+    except AttributeError:
+        raise ImportError(f"Module '{module_name}' does not define a '{attribute}' variable.")
+    return result
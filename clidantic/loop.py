@@ -0,0 +1,87 @@
+import asyncio
+import atexit
+import os
+import threading
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+_local = threading.local()
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Creates a new event loop, using uvloop when available.
+
+    Returns:
+        asyncio.AbstractEventLoop: a new, not running event loop.
+    """
+    try:
+        import uvloop
+
+        return uvloop.new_event_loop()
+    except ImportError:
+        return asyncio.new_event_loop()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Returns the event loop managed by clidantic for the current thread, creating it if required.
+    The same loop is shared by every async command executed in the same thread (and process), so that
+    resources bound to it, such as connection pools, can be reused across invocations.
+
+    Returns:
+        asyncio.AbstractEventLoop: shared event loop for the current thread.
+    """
+    loop = getattr(_local, "loop", None)
+    # forked processes cannot reuse the loop of their parent
+    if loop is None or loop.is_closed() or _local.pid != os.getpid():
+        loop = new_event_loop()
+        _local.loop, _local.pid = loop, os.getpid()
+    return loop
+
+
+def close_event_loop() -> None:
+    """Closes the event loop of the current thread, if any, cancelling pending tasks."""
+    loop = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed() or _local.pid != os.getpid():
+        return
+    try:
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        loop.close()
+        _local.loop = None
+
+
+def run(awaitable: Awaitable) -> Any:
+    """Runs the given coroutine until completion on the shared event loop.
+
+    Args:
+        awaitable (Awaitable): coroutine or other awaitable object.
+
+    Returns:
+        Any: result of the coroutine.
+    """
+    return get_event_loop().run_until_complete(awaitable)
+
+
+def synchronize(function: Callable[..., Awaitable]) -> Callable:
+    """Wraps a coroutine function into a standard function, executed on the shared event loop.
+
+    Args:
+        function (Callable[..., Awaitable]): coroutine function, e.g. an `async def` command.
+
+    Returns:
+        Callable: synchronous function returning the result of the coroutine.
+    """
+
+    @wraps(function)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return run(function(*args, **kwargs))
+
+    return wrapper
+
+
+atexit.register(close_event_loop)
@@ -0,0 +1,208 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+from typing import Any, ContextManager, Dict, Iterator, List, NamedTuple, Optional, TextIO
+
+PROFILE_VARIABLE = "CLIDANTIC_PROFILE"
+PROFILE_FLAG = "--clidantic-profile"
+
+
+class Span(NamedTuple):
+    """Timing of a single phase.
+
+    Attributes:
+        name (str): name of the phase, e.g. 'options' or 'validate'.
+        start (float): start time, in seconds from the profiler creation.
+        duration (float): duration in seconds.
+        depth (int): nesting level of the phase within its thread.
+        thread (int): identifier of the thread executing the phase.
+        meta (Dict[str, Any]): additional information, such as the command name.
+    """
+
+    name: str
+    start: float
+    duration: float
+    depth: int
+    thread: int
+    meta: Dict[str, Any]
+
+
+class Profiler:
+    """Records the time spent by clidantic in its phases: model inspection, option generation, entrypoint
+    creation, argument parsing, validation and command execution. Disabled by default, it can be enabled
+    with the `CLIDANTIC_PROFILE` environment variable or the hidden `--clidantic-profile` flag.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.destination: Optional[str] = None
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self._local = threading.local()
+        self._registered = False
+
+    def enable(self, destination: str = "stderr") -> None:
+        """Starts recording phases, writing the report to the given destination at exit.
+
+        Args:
+            destination (str, optional): 'stderr', a '.json' file or a '.trace.json' file for Chrome traces.
+                                         Defaults to "stderr".
+        """
+        self.enabled = True
+        self.destination = destination
+        if not self._registered:
+            atexit.register(self.write)
+            self._registered = True
+
+    def phase(self, name: str, **meta: Any) -> ContextManager:
+        """Context manager measuring the given phase, when enabled.
+
+        Args:
+            name (str): name of the phase.
+            **meta (Any): additional information stored with the measure.
+
+        Returns:
+            ContextManager: context manager recording the enclosed block.
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._record(name, meta)
+
+    @contextmanager
+    def _record(self, name: str, meta: Dict[str, Any]) -> Iterator[None]:
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._local.depth = depth
+            span = Span(name, start - self.origin, end - start, depth, threading.get_ident(), meta)
+            self.spans.append(span)
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Returns the recorded phases in start order, including the time not spent in nested phases.
+
+        Returns:
+            List[Dict[str, Any]]: one entry per phase, with total and self times in seconds.
+        """
+        spans = sorted(self.spans, key=lambda s: (s.thread, s.start, -s.duration))
+        entries = []
+        for i, span in enumerate(spans):
+            children = 0.0
+            for other in islice(spans, i + 1, None):
+                if other.thread != span.thread or other.start >= span.start + span.duration:
+                    break
+                if other.depth == span.depth + 1:
+                    children += other.duration
+            entries.append(
+                {
+                    "name": span.name,
+                    "start": span.start,
+                    "total": span.duration,
+                    "self": span.duration - children,
+                    "depth": span.depth,
+                    "thread": span.thread,
+                    **span.meta,
+                }
+            )
+        return entries
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Returns the recorded phases in the Chrome trace event format (chrome://tracing, Perfetto).
+
+        Returns:
+            Dict[str, Any]: JSON-compatible trace.
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "ph": "X",
+                "ts": span.start * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.thread,
+                "args": span.meta,
+            }
+            for span in self.spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_text(self, file: TextIO) -> None:
+        """Writes a human readable report, one phase per line indented by nesting level.
+
+        Args:
+            file (TextIO): output stream.
+        """
+        elapsed = time.perf_counter() - self.origin
+        file.write(f"clidantic profile: {elapsed * 1e3:.3f} ms since import\n")
+        file.write(f"{'phase':<48s} {'total (ms)':>12s} {'self (ms)':>12s}\n")
+        fixed = ("name", "start", "total", "self", "depth", "thread")
+        for entry in self.report():
+            label = "  " * entry["depth"] + entry["name"]
+            details = [f"{k}={v}" for k, v in entry.items() if k not in fixed]
+            if details:
+                label += f" ({', '.join(details)})"
+            file.write(f"{label:<48s} {entry['total'] * 1e3:>12.3f} {entry['self'] * 1e3:>12.3f}\n")
+
+    def write(self) -> None:
+        """Writes the report to the configured destination: text on stderr, JSON or Chrome trace files."""
+        if not self.enabled or not self.spans:
+            return
+        destination = self.destination or "stderr"
+        if destination in ("1", "stderr"):
+            self.write_text(sys.stderr)
+            return
+        content = self.chrome_trace() if destination.endswith(".trace.json") else self.report()
+        with open(destination, "w", encoding="utf-8") as file:
+            json.dump(content, file, indent=2)
+
+
+def _is_profile_flag(arg: str) -> bool:
+    return arg == PROFILE_FLAG or arg.startswith(f"{PROFILE_FLAG}=")
+
+
+def find_profile_flag(args: List[str]) -> Optional[str]:
+    """Looks for the hidden profiling flag among the given arguments.
+
+    Args:
+        args (List[str]): command line arguments.
+
+    Returns:
+        Optional[str]: destination of the report given by the last flag, or None when the flag is not present.
+    """
+    flags = [arg for arg in args if _is_profile_flag(arg)]
+    if not flags:
+        return None
+    _, _, destination = flags[-1].partition("=")
+    return destination or "stderr"
+
+
+def extract_profile_flag(args: List[str]) -> Optional[List[str]]:
+    """Looks for the hidden profiling flag among the given arguments, enabling the profiler if found.
+
+    Args:
+        args (List[str]): command line arguments.
+
+    Returns:
+        Optional[List[str]]: arguments without the profiling flag, or None when the flag is not present.
+    """
+    destination = find_profile_flag(args)
+    if destination is None:
+        return None
+    profiler.enable(destination)
+    return [arg for arg in args if not _is_profile_flag(arg)]
+
+
+profiler = Profiler()
+# both the variable and the flag are read on import, so that phases executed while defining commands are recorded
+_destination = find_profile_flag(getattr(sys, "argv", [])[1:]) or os.environ.get(PROFILE_VARIABLE)
+if _destination:
+    profiler.enable(_destination)
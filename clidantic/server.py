@@ -0,0 +1,98 @@
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import traceback
+from typing import Optional
+
+import click
+
+from clidantic.batch import invoke_command
+from clidantic.client import EXIT_CODE, HEADER, MAX_FDS, receive_exactly
+from clidantic.lazy import LazyCommand
+
+
+def warm_up(command: click.Command) -> None:
+    """Resolves every command in the given tree, so that lazy commands and subgroups are built only once,
+    in the server process, instead of once per request.
+
+    Args:
+        command (click.Command): root command or group.
+    """
+    if isinstance(command, LazyCommand):
+        command._materialize()
+    if isinstance(command, click.Group):
+        ctx = click.Context(command)
+        for name in command.list_commands(ctx):
+            warm_up(command.get_command(ctx, name))
+
+
+class CommandRequestHandler(socketserver.BaseRequestHandler):
+    """Executes a single forwarded command line, within a process forked from the server.
+    Standard streams are replaced with the descriptors received from the client."""
+
+    server: "CommandServer"
+
+    def handle(self) -> None:
+        data, fds, _, _ = socket.recv_fds(self.request, HEADER.size, MAX_FDS)
+        (size,) = HEADER.unpack(data + receive_exactly(self.request, HEADER.size - len(data)))
+        request = json.loads(receive_exactly(self.request, size))
+        # replace the process state with the one of the client
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        for target, fd in enumerate(fds):
+            if fd != target:
+                os.dup2(fd, target)
+                os.close(fd)
+        sys.stdin = io.TextIOWrapper(io.FileIO(0, "r", closefd=False))
+        sys.stdout = io.TextIOWrapper(io.FileIO(1, "w", closefd=False), line_buffering=True)
+        sys.stderr = io.TextIOWrapper(io.FileIO(2, "w", closefd=False), line_buffering=True)
+        try:
+            exit_code, _, exception = invoke_command(self.server.command, request["args"], self.server.prog_name)
+            # unexpected errors are reported as an uncaught exception would
+            if exception is not None and not isinstance(exception, (click.ClickException, click.Abort, SystemExit)):
+                traceback.print_exception(type(exception), exception, exception.__traceback__)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        self.request.sendall(EXIT_CODE.pack(exit_code))
+
+
+class CommandServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server executing each request in a child process, forked from a warm interpreter."""
+
+    def __init__(self, socket_path: str, command: click.Command, prog_name: str) -> None:
+        self.command = command
+        self.prog_name = prog_name
+        # remove leftovers of previous servers
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.unlink(socket_path)
+        super().__init__(socket_path, CommandRequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def create_server(
+    command: click.Command, socket_path: str, prog_name: Optional[str] = None, warm: bool = True
+) -> CommandServer:
+    """Creates a server listening on the given Unix socket, executing the given command for each client.
+
+    Args:
+        command (click.Command): already built click command or group.
+        socket_path (str): path where the socket is created.
+        prog_name (Optional[str], optional): program name shown in usage messages. Defaults to the command name.
+        warm (bool, optional): builds every lazy command in advance. Defaults to True.
+
+    Returns:
+        CommandServer: server instance, not yet serving.
+    """
+    if warm:
+        warm_up(command)
+    return CommandServer(socket_path, command, prog_name=prog_name or command.name or "root")
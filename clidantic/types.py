@@ -1,11 +1,25 @@
 import importlib
 import json
+import sys
 from enum import Enum
-from typing import Any, Literal, Mapping, Optional
+from typing import Any, Callable, Dict, Iterator, Literal, Optional, Tuple, Type, Union
 
 from click import Context, Parameter
+from click import types as click_types
 from click.types import Choice, ParamType
 
+from clidantic import inputs
+
+_MISSING = object()
+# click types converting values that pydantic would convert the same way, see `raw_type`: generic function types
+# are excluded, since their fields may not accept strings, e.g. `StrictInt`
+RAW_TYPES = (
+    click_types.StringParamType,
+    click_types.IntParamType,
+    click_types.FloatParamType,
+    click_types.UUIDParameterType,
+)
+
 
 class BytesType(ParamType):
     name = "bytes"
@@ -27,39 +41,254 @@ class JsonType(ParamType):
         self.should_load = should_load
 
     def convert(self, value: Any, param: Optional[Parameter], ctx: Optional[Context]) -> Any:
-        if isinstance(value, Mapping) or not self.should_load:
+        if not isinstance(value, str):
             return value
+        # documents can also be read from files ('@path') or from the standard input ('-')
+        source = value[1:] if inputs.is_reference(value) else value if value == inputs.STDIN else None
         try:
+            if source is not None:
+                return inputs.load_json(source) if self.should_load else inputs.read_text(source)
+            if not self.should_load:
+                return value
             return json.loads(value)
-        except json.JSONDecodeError as exc:
+        except OSError as exc:
+            self.fail(f"'{source}' cannot be read ({str(exc)})", param, ctx)
+        except ValueError as exc:
             self.fail(f"'{value}' is not a valid JSON string ({str(exc)})", param, ctx)
 
 
+_IMPORT_CACHE: Dict[str, Union[Any, Exception]] = {}
+
+
+def import_object(path: str) -> Any:
+    """Imports the object referenced by the given dotted path, e.g. 'package.module.Class'.
+    Results are cached by path, failures included, so that repeated conversions of the same value
+    do not go through the import machinery again.
+
+    Args:
+        path (str): dotted path, composed of module name and variable name.
+
+    Raises:
+        ImportError: when the module cannot be imported or does not define the given variable.
+        AssertionError: when the path is not a valid dotted path.
+
+    Returns:
+        Any: imported object.
+    """
+    result = _IMPORT_CACHE.get(path, _MISSING)
+    if result is _MISSING:
+        try:
+            result = _import_object(path)
+        except (ImportError, AssertionError) as exc:
+            result = exc
+        _IMPORT_CACHE[path] = result
+    if isinstance(result, (ImportError, AssertionError)):
+        raise result
+    return result
+
+
+def clear_import_cache() -> None:
+    """Clears the cache of imported objects, e.g. after modifying `sys.path`."""
+    _IMPORT_CACHE.clear()
+
+
+def _import_object(path: str) -> Any:
+    assert "." in path, f"'{path}' is not a valid dotted path"
+    module_name, class_name = path.rsplit(".", maxsplit=1)
+    assert all(s.isidentifier() for s in module_name.split(".")), f"'{path}' is not a valid module name"
+    assert class_name.isidentifier(), f"Variable '{class_name}' is not a valid identifier"
+
+    module = sys.modules.get(module_name) or importlib.import_module(module_name)
+    try:
+        return getattr(module, class_name)
+    except AttributeError:
+        raise ImportError(f"Module '{module_name}' does not define a '{class_name}' variable.")
+
+
+def object_path(value: Any) -> str:
+    """Returns the dotted path of the given module-level object, the inverse of `import_object`.
+
+    Args:
+        value (Any): class, function or lazy reference.
+
+    Returns:
+        str: dotted path, e.g. 'package.module.Class'.
+    """
+    if isinstance(value, LazyImport):
+        return value.path
+    return f"{value.__module__}.{value.__name__}"
+
+
+class LazyImport:
+    """Reference to an object, given as dotted path, that is only imported when first used.
+    As a field type, it allows to skip importing heavy modules when parsing arguments or printing the help:
+    the object is imported when calling `resolve()`, or transparently when calling the reference or accessing
+    its attributes. `LazyImport[Base]` also checks that the imported object is a subclass of `Base`.
+    """
+
+    __slots__ = ("path", "_target")
+    bound: Optional[type] = None
+    _bounded: Dict[type, Type["LazyImport"]] = {}
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._target: Any = _MISSING
+
+    def __class_getitem__(cls, bound: type) -> Type["LazyImport"]:
+        if bound not in cls._bounded:
+            name = f"LazyImport[{getattr(bound, '__name__', repr(bound))}]"
+            cls._bounded[bound] = type(name, (LazyImport,), {"__slots__": (), "bound": bound})
+        return cls._bounded[bound]
+
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable]:
+        yield cls.validate
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        field_schema.update(type="string", format="import-path")
+
+    @classmethod
+    def validate(cls, value: Any) -> "LazyImport":
+        if isinstance(value, LazyImport):
+            if type(value) is cls:
+                return value
+            value = value.path if value._target is _MISSING else value._target
+        if isinstance(value, str):
+            return cls(value)
+        # objects already imported, e.g. defaults, are wrapped as they are
+        reference = cls(object_path(value))
+        reference._set_target(value)
+        return reference
+
+    def _set_target(self, target: Any) -> None:
+        if self.bound is not None and not (isinstance(target, type) and issubclass(target, self.bound)):
+            raise TypeError(f"'{self.path}' is not a subclass of '{self.bound.__name__}'")
+        self._target = target
+
+    def resolve(self) -> Any:
+        """Imports the referenced object, if not already imported.
+
+        Raises:
+            ImportError: when the object cannot be imported.
+            TypeError: when the object is not a subclass of the given bound.
+
+        Returns:
+            Any: referenced object.
+        """
+        if self._target is _MISSING:
+            self._set_target(import_object(self.path))
+        return self._target
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # never import for special methods, e.g. while copying or pickling
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __copy__(self) -> "LazyImport":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "LazyImport":
+        return self
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (type(self).validate, (self.path,))
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyImport):
+            return self.path == other.path
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def __str__(self) -> str:
+        return self.path
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.path!r})"
+
+
 class ModuleType(ParamType):
     name = "module"
 
-    def _import_object(self, value: str) -> Any:
-        module_name, class_name = value.rsplit(".", maxsplit=1)
-        assert all(s.isidentifier() for s in module_name.split(".")), f"'{value}' is not a valid module name"
-        assert class_name.isidentifier(), f"Variable '{class_name}' is not a valid identifier"
-
-        module = importlib.import_module(module_name)
-        if class_name:
-            try:
-                return getattr(module, class_name)
-            except AttributeError:
-                raise ImportError(f"Module '{module_name}' does not define a '{class_name}' variable.")
-        return None
+    def __init__(self, lazy: bool = False) -> None:
+        super().__init__()
+        self.lazy = lazy
 
     def convert(self, value: str, param: Optional[Parameter], ctx: Optional[Context]) -> Any:
         try:
             if isinstance(value, str):
-                return self._import_object(value)
+                if self.lazy:
+                    # only check the syntax, the import is left to the model
+                    module_name, _, class_name = value.rpartition(".")
+                    assert all(s.isidentifier() for s in [*module_name.split("."), class_name])
+                    return LazyImport(value)
+                return import_object(value)
             return value
         except Exception as exc:
             self.fail(f"'{value}' is not a valid object ({type(exc)}: {str(exc)})", param, ctx)
 
 
+class RawType(ParamType):
+    """Click type passing values through untouched, so that pydantic performs the only conversion.
+    The wrapped type is kept for display purposes, e.g. names and metavars, and to report invalid values.
+    """
+
+    def __init__(self, wrapped: ParamType) -> None:
+        super().__init__()
+        self.wrapped = wrapped
+        self.name = wrapped.name
+        self.envvar_list_splitter = wrapped.envvar_list_splitter
+
+    def convert(self, value: Any, param: Optional[Parameter], ctx: Optional[Context]) -> Any:
+        return value
+
+    def get_metavar(self, param: Parameter) -> Optional[str]:
+        return self.wrapped.get_metavar(param)
+
+    def to_info_dict(self) -> Dict[str, Any]:
+        return self.wrapped.to_info_dict()
+
+
+def raw_type(param_type: ParamType) -> ParamType:
+    """Wraps the given click type with `RawType`, when pydantic can convert strings by itself with the same
+    results: strings, numbers, UUIDs and any other type converted by calling it (e.g. paths), also within tuples.
+
+    Args:
+        param_type (ParamType): click type of an option.
+
+    Returns:
+        ParamType: the equivalent pass-through type, or the given one when it cannot be skipped.
+    """
+    if isinstance(param_type, click_types.Tuple):
+        return click_types.Tuple([raw_type(item) for item in param_type.types])
+    # subclasses may convert differently, e.g. clamped ranges
+    if type(param_type) in RAW_TYPES:
+        return RawType(param_type)
+    return param_type
+
+
+def original_type(param_type: ParamType) -> ParamType:
+    """Reverses `raw_type`, returning the click type actually converting values.
+
+    Args:
+        param_type (ParamType): click type of an option, possibly a pass-through one.
+
+    Returns:
+        ParamType: the wrapped click type.
+    """
+    if isinstance(param_type, click_types.Tuple):
+        return click_types.Tuple([original_type(item) for item in param_type.types])
+    if isinstance(param_type, RawType):
+        return param_type.wrapped
+    return param_type
+
+
 class EnumChoice(Choice):
     name = "enum"
 
@@ -0,0 +1,158 @@
+import io
+import logging
+import os
+import sys
+import threading
+import time
+
+import click
+import pytest
+from pydantic import BaseModel
+
+from clidantic import Parser
+from clidantic.batch import ThreadLocalStream, parse_record, read_records
+
+LOG = logging.getLogger(__name__)
+
+
+class Config(BaseModel):
+    name: str
+    count: int = 1
+
+
+def create_cli() -> Parser:
+    cli = Parser()
+
+    @cli.command()
+    def run(config: Config):
+        print(f"{config.name}:{config.count}")
+        return config.count * 2
+
+    return cli
+
+
+def test_parse_record():
+    assert parse_record(["--name", 1]) == ["--name", "1"]
+    assert parse_record('["--name", "a b"]') == ["--name", "a b"]
+    assert parse_record("--name 'a b' --count=2") == ["--name", "a b", "--count=2"]
+    with pytest.raises(AssertionError):
+        parse_record('{"name": "a"}')
+    lines = io.StringIO('# comment\n["--name=a"]\n\n--name=b --count 3\n')
+    assert list(read_records(lines)) == [["--name=a"], ["--name=b", "--count", "3"]]
+
+
+def test_batch_run():
+    cli = create_cli()
+    records = [["--name=a"], '["--name=b", "--count=2"]', "--count=3", "--name=c --count=x", "--help"]
+    results = list(cli.batch(records))
+    for result in results:
+        LOG.debug(result)
+    assert [r.index for r in results] == [0, 1, 2, 3, 4]
+    assert [r.exit_code for r in results] == [0, 0, 2, 2, 0]
+    assert results[0].output == "a:1\n"
+    assert results[0].return_value == 2
+    assert results[1].output == "b:2\n"
+    assert results[1].return_value == 4
+    assert "Missing option '--name'" in results[2].output
+    assert results[2].exception is not None
+    assert "'x' is not a valid integer" in results[3].output
+    assert "Usage: run [OPTIONS]" in results[4].output
+    assert results[4].exception is None
+
+
+def test_batch_errors():
+    cli = Parser()
+    with pytest.raises(ValueError):
+        list(cli.batch([[]]))
+
+    @cli.command()
+    def fail():
+        raise RuntimeError("failure")
+
+    result = next(cli.batch([[]]))
+    assert result.exit_code == 1
+    assert isinstance(result.exception, RuntimeError)
+
+
+def test_batch_processes():
+    cli = Parser()
+
+    @cli.command()
+    def run(config: Config):
+        print(f"{config.name}:{config.count}")
+        if config.count < 0:
+            raise ValueError("negative")
+        return os.getpid(), config.count * 2
+
+    records = [[f"--name=r{i}", f"--count={i}"] for i in range(8)] + [["--count=x"], ["--name=n", "--count=-1"]]
+    results = list(cli.batch(records, jobs=2))
+    assert [r.index for r in results] == list(range(10))
+    assert [r.exit_code for r in results] == [0] * 8 + [2, 1]
+    for i, result in enumerate(results[:8]):
+        pid, value = result.return_value
+        assert pid != os.getpid()
+        assert value == i * 2
+        assert result.output == f"r{i}:{i}\n"
+    assert "'x' is not a valid integer" in results[8].output
+    assert isinstance(results[9].exception, ValueError)
+    assert results[9].output == "n:-1\n"
+    # records are validated while the workers execute the previous ones
+    consumed = []
+
+    def generate():
+        for i in range(20):
+            consumed.append(i)
+            yield [f"--name=r{i}", f"--count={i}"]
+
+    results = cli.batch(generate(), jobs=2)
+    assert next(results).return_value[1] == 0
+    assert len(consumed) <= 5
+    assert [r.return_value[1] for r in results] == [i * 2 for i in range(1, 20)]
+
+
+def test_batch_processes_commands():
+    cli = Parser()
+
+    @cli.command()
+    def double(config: Config):
+        return config.count * 2
+
+    @cli.command()
+    def negate(config: Config):
+        return -config.count
+
+    # the second command is only seen after some records, restarting the workers
+    records = [["double", "--name=a", f"--count={i}"] for i in range(3)] + [["negate", "--name=b", "--count=4"]]
+    results = list(cli.batch(records + [["double", "--name=c", "--count=5"]], jobs=2))
+    assert [r.return_value for r in results] == [0, 2, 4, -4, 10]
+
+
+def test_batch_threads():
+    cli = Parser()
+    current = threading.get_ident()
+
+    @cli.command()
+    def run(config: Config):
+        # later records complete first
+        time.sleep(0.001 * (20 - config.count))
+        print(f"{config.name}:{config.count}")
+        click.echo(f"done {config.count}", err=True)
+        return threading.get_ident()
+
+    records = [["--name=a", f"--count={i}"] for i in range(20)] + [["--count=x"]]
+    results = list(cli.batch(iter(records), jobs=4, executor="thread"))
+    assert [r.index for r in results] == list(range(21))
+    for i, result in enumerate(results[:-1]):
+        assert result.exit_code == 0
+        assert result.output == f"a:{i}\ndone {i}\n"
+        assert result.return_value != current
+    assert results[-1].exit_code == 2
+    assert "'x' is not a valid integer" in results[-1].output
+    assert not isinstance(sys.stdout, ThreadLocalStream)
+    # as-completed streaming
+    results = list(cli.batch(records, jobs=4, executor="thread", ordered=False))
+    assert sorted(r.index for r in results) == list(range(21))
+    assert [r.index for r in results] != list(range(21))
+    assert all(r.output == f"a:{r.index}\ndone {r.index}\n" for r in results if r.exit_code == 0)
+    with pytest.raises(ValueError):
+        cli.batch(records, executor="fiber")
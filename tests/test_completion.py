@@ -0,0 +1,169 @@
+import importlib
+import json
+import os
+import sys
+from enum import Enum
+from pathlib import Path
+from typing import List, Literal
+
+import pytest
+from pydantic import BaseModel
+
+from clidantic import Parser
+from clidantic.completion import complete, is_stale, load_index, split_line
+from clidantic.index import build_completion_index, ensure_completion_index, write_completion_index
+
+
+class Mode(str, Enum):
+    fast = "fast"
+    slow = "slow"
+
+
+class Optimizer(BaseModel):
+    name: Literal["adam", "sgd"] = "adam"
+    lr: float = 1e-3
+
+
+class Training(BaseModel):
+    epochs: int = 1
+    verbose: bool = False
+    mode: Mode = Mode.fast
+    optimizer: Optimizer = Optimizer()
+
+
+@pytest.fixture(scope="function")
+def cli() -> Parser:
+    cli = Parser(name="app")
+    store = Parser(name="store")
+
+    @cli.command()
+    def train(config: Training):
+        return config
+
+    @store.command()
+    def add(config: Optimizer):
+        return config
+
+    cli.subgroups.append(store)
+    cli._update_entrypoint()
+    return cli
+
+
+def test_completion_index(cli: Parser):
+    index = build_completion_index(cli.entrypoint, prog_name=cli.name)
+    assert index["prog"] == "app"
+    root = index["root"]
+    assert set(root["commands"]) == {"train", "store"}
+    train = root["commands"]["train"]["options"]
+    assert train["--epochs"] == {"flag": False, "choices": None}
+    assert train["--verbose"]["flag"] and train["--no-verbose"]["flag"]
+    assert train["--mode"]["choices"] == ["fast", "slow"]
+    assert train["--optimizer.name"]["choices"] == ["adam", "sgd"]
+    assert set(root["commands"]["store"]["commands"]) == {"add"}
+    assert f"{__name__}:Training" in index["fingerprints"]
+    assert os.path.abspath(__file__) in index["sources"]
+    # the index must be serializable as is
+    assert json.loads(json.dumps(index)) == index
+
+
+def test_split_line():
+    assert split_line("app tr") == (["app"], "tr")
+    assert split_line("app train ") == (["app", "train"], "")
+    assert split_line("app train --mode 'sl") == (["app", "train", "--mode"], "sl")
+    assert split_line("") == ([], "")
+
+
+def test_complete(cli: Parser):
+    index = build_completion_index(cli.entrypoint, prog_name=cli.name)
+    assert complete(index, ["app"], "") == ["store", "train"]
+    assert complete(index, ["app"], "st") == ["store"]
+    assert complete(index, ["app", "store"], "") == ["add"]
+    assert complete(index, ["app", "train"], "--opt") == ["--optimizer.lr", "--optimizer.name"]
+    assert complete(index, ["app", "train", "--mode"], "") == ["fast", "slow"]
+    assert complete(index, ["app", "train"], "--optimizer.name=s") == ["--optimizer.name=sgd"]
+    # option values are skipped, flags do not expect a value
+    assert complete(index, ["app", "train", "--epochs", "store"], "") == []
+    assert complete(index, ["app", "train", "--verbose"], "--m") == ["--mode"]
+    # free values do not have candidates
+    assert complete(index, ["app", "train", "--epochs"], "") == []
+
+
+def test_ensure_completion_index(cli: Parser, tmp_path: Path):
+    path = str(tmp_path / "index" / "app.json")
+    assert ensure_completion_index(cli.entrypoint, path, prog_name=cli.name)
+    index = load_index(path)
+    assert not is_stale(index)
+    # valid indices are not rebuilt
+    assert not ensure_completion_index(cli.entrypoint, path, prog_name=cli.name)
+    # touched sources only refresh the timestamps when nothing changed
+    source = next(iter(index["sources"]))
+    index["sources"][source] -= 1
+    Path(path).write_text(json.dumps(index))
+    assert is_stale(load_index(path))
+    assert not ensure_completion_index(cli.entrypoint, path, prog_name=cli.name)
+    assert not is_stale(load_index(path))
+    # changes in the fingerprints are detected as well
+    index = write_completion_index(cli.entrypoint, path, prog_name=cli.name)
+    index["fingerprints"] = {}
+    index["sources"][source] -= 1
+    Path(path).write_text(json.dumps(index))
+    assert ensure_completion_index(cli.entrypoint, path, prog_name=cli.name)
+
+
+def test_completion_on_call(cli: Parser, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    path = tmp_path / "app.json"
+    cli.completion_index = str(path)
+    monkeypatch.setattr("sys.argv", ["app", "train", "--epochs=2"])
+    with pytest.raises(SystemExit):
+        cli()
+    assert load_index(str(path))["prog"] == "app"
+
+
+def test_completion_index_nested_sources(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    source = tmp_path / "index_inner.py"
+    source.write_text("from pydantic import BaseModel\n\nclass Inner(BaseModel):\n    value: int = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "index_inner", raising=False)
+    module = importlib.import_module("index_inner")
+
+    class Outer(BaseModel):
+        inner: List[module.Inner] = []
+        mode: Mode = Mode.fast
+
+    cli = Parser(name="app")
+
+    @cli.command()
+    def run(config: Outer):
+        pass
+
+    cli._update_entrypoint()
+    index = build_completion_index(cli.entrypoint, prog_name=cli.name)
+    # nested models declared in other modules are tracked as well
+    assert str(source) in index["sources"]
+    assert not is_stale(index)
+    index["sources"][str(source)] -= 1
+    assert is_stale(index)
+
+
+def test_completion_index_parent_sources(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    source = tmp_path / "index_parent.py"
+    source.write_text("from pydantic import BaseModel\n\nclass Parent(BaseModel):\n    value: int = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "index_parent", raising=False)
+    module = importlib.import_module("index_parent")
+
+    class Child(module.Parent):
+        name: str = "a"
+
+    cli = Parser(name="app")
+
+    @cli.command()
+    def run(config: Child):
+        pass
+
+    cli._update_entrypoint()
+    index = build_completion_index(cli.entrypoint, prog_name=cli.name)
+    # parent models declared in other modules are tracked as well
+    assert str(source) in index["sources"]
+    index["sources"][str(source)] -= 1
+    assert is_stale(index)
@@ -0,0 +1,86 @@
+import json
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+from click.testing import CliRunner
+from pydantic import BaseModel, ValidationError
+
+from clidantic import Parser, config
+from clidantic.config import load_config_file, merge_settings
+
+
+class Database(BaseModel):
+    host: str
+    port: int = 5432
+
+
+class Settings(BaseModel):
+    name: str
+    tags: List[str] = []
+    database: Database
+
+
+@pytest.fixture(scope="function")
+def cli() -> Parser:
+    cli = Parser()
+
+    @cli.command(config_option="--config")
+    def run(settings: Settings):
+        return settings
+
+    return cli
+
+
+def test_merge_settings():
+    base = {"a": 1, "b": {"c": 2, "d": 3}}
+    override = {"b": {"c": 4}, "e": 5}
+    assert merge_settings(base, override) == {"a": 1, "b": {"c": 4, "d": 3}, "e": 5}
+    assert base == {"a": 1, "b": {"c": 2, "d": 3}}
+
+
+def test_config_layers(runner: CliRunner, cli: Parser, tmp_path: Path):
+    (tmp_path / "base.json").write_text(json.dumps({"name": "base", "database": {"host": "db", "port": 1}}))
+    (tmp_path / "local.toml").write_text('tags = ["a"]\n[database]\nport = 2\n')
+    (tmp_path / "user.yaml").write_text("name: user\n")
+    files = [f"--config={tmp_path / name}" for name in ("base.json", "local.toml", "user.yaml")]
+    result = runner.invoke(cli, files, standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value == Settings(name="user", tags=["a"], database=Database(host="db", port=2))
+    # only options explicitly provided override the files
+    result = runner.invoke(cli, files + ["--database.port=3"], standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value == Settings(name="user", tags=["a"], database=Database(host="db", port=3))
+    # without files, required fields are still checked by pydantic
+    result = runner.invoke(cli, ["--name=test"], standalone_mode=False)
+    assert isinstance(result.exception, ValidationError)
+
+
+def test_config_errors(runner: CliRunner, cli: Parser, tmp_path: Path):
+    result = runner.invoke(cli, [f"--config={tmp_path / 'missing.yaml'}"])
+    assert result.exit_code == 2
+    (tmp_path / "settings.ini").write_text("")
+    result = runner.invoke(cli, [f"--config={tmp_path / 'settings.ini'}"])
+    assert result.exit_code == 2
+    assert "unsupported format" in result.output
+    (tmp_path / "list.yaml").write_text("- a\n- b\n")
+    result = runner.invoke(cli, [f"--config={tmp_path / 'list.yaml'}"])
+    assert result.exit_code == 2
+    assert "does not contain a mapping" in result.output
+
+
+def test_config_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    config.clear_config_cache()
+    path = tmp_path / "settings.json"
+    path.write_text('{"name": "first"}')
+    calls = []
+    monkeypatch.setitem(config.LOADERS, ".json", lambda content: calls.append(content) or json.loads(content))
+    first = load_config_file(str(path))
+    assert load_config_file(str(path)) is first
+    assert len(calls) == 1
+    # files are parsed again when modified
+    path.write_text('{"name": "second!"}')
+    os.utime(path, ns=(0, 0))
+    assert load_config_file(str(path)) == {"name": "second!"}
+    assert len(calls) == 2
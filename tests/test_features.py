@@ -1,10 +1,29 @@
+import asyncio
+import importlib
+import json
 import logging
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Tuple
 
 import click
 import pytest
 from click.testing import CliRunner
+from pydantic import BaseModel, Field, Json, StrictInt, ValidationError, create_model
 
-from clidantic import Parser
+from clidantic import CLIField, Parser
+from clidantic.cache import NotCacheable, cached_settings_to_options, dump_option, model_fingerprint
+from clidantic.convert import OptionSpec, kwargs_to_settings, settings_to_options
+from clidantic.core import RunnableCommand
+from clidantic.help import command_sources
+from clidantic.lazy import LazyCommand
+from clidantic.loop import get_event_loop
+from clidantic.profile import extract_profile_flag, profiler
+from clidantic.types import RawType
 
 LOG = logging.getLogger(__name__)
 
@@ -302,3 +321,747 @@ def test_merging_nested(runner: CliRunner):
     assert not result.exception
     assert "name" in result.output
     assert "passwd" in result.output
+
+
+def test_lazy_command(runner: CliRunner):
+    cli = Parser(lazy=True)
+
+    class Config(BaseModel):
+        name: str
+        count: int = 1
+
+    @cli.command()
+    def first(config: Config):
+        """First command."""
+        print(f"{config.name} x{config.count}")
+
+    @cli.command()
+    def second(config: Config):
+        """Second command."""
+        print(config.name)
+
+    assert isinstance(first, LazyCommand)
+    assert not first._loaded and not second._loaded
+    # listing the commands only requires names and help strings
+    result = runner.invoke(cli, ["--help"])
+    assert not result.exception
+    assert "First command." in result.output
+    assert "Second command." in result.output
+    assert not first._loaded and not second._loaded
+    # running a command only materializes the selected one
+    result = runner.invoke(cli, ["first", "--name=test", "--count=2"])
+    assert not result.exception
+    assert "test x2" in result.output
+    assert first._loaded and not second._loaded
+    assert [p.name for p in first.params] == ["name", "count"]
+
+
+def test_lazy_command_override():
+    cli = Parser(lazy=True)
+
+    class CustomCommand(click.Command):
+        pass
+
+    @cli.command(command_class=CustomCommand)
+    def custom():
+        pass
+
+    @cli.command(lazy=False)
+    def eager():
+        pass
+
+    assert isinstance(custom, LazyCommand)
+    assert isinstance(custom, CustomCommand)
+    assert not isinstance(eager, LazyCommand)
+    assert custom.callback is not None
+    assert custom._loaded
+
+
+def test_merging_lazy_reference(runner: CliRunner):
+    sys.modules.pop("tests.utils.lazy_cli", None)
+    items = Parser(name="items")
+
+    @items.command()
+    def buy():
+        print("bought")
+
+    @items.command()
+    def sell():
+        print("sold")
+
+    cli = Parser.merge(items, "tests.utils.lazy_cli:store", name="main")
+    assert len(cli.subgroups) == 2
+    cli._update_entrypoint()
+    assert isinstance(cli.entrypoint, click.Group)
+    assert "tests.utils.lazy_cli" not in sys.modules
+    # running another subgroup does not import the reference
+    result = runner.invoke(cli, ["items", "buy"])
+    assert not result.exception
+    assert "bought" in result.output
+    assert "tests.utils.lazy_cli" not in sys.modules
+    # selecting the subgroup imports it
+    result = runner.invoke(cli, ["store", "add"])
+    assert not result.exception
+    assert "added" in result.output
+    assert "tests.utils.lazy_cli" in sys.modules
+
+
+def test_merging_wrong_reference(runner: CliRunner):
+    with pytest.raises(AssertionError):
+        Parser.merge(Parser(name="items"), "tests.utils.lazy_cli")
+    cli = Parser(subgroups=["tests.utils.lazy_cli:missing"])
+    result = runner.invoke(cli, ["missing"])
+    assert isinstance(result.exception, ImportError)
+
+
+class Color(Enum):
+    red = "red"
+    blue = "blue"
+
+
+class CachedInner(BaseModel):
+    tags: List[str] = []
+    flag: bool = False
+
+
+class CachedConfig(BaseModel):
+    name: str = Field(description="a name")
+    color: Color = Color.red
+    level: Literal[1, 2] = 1
+    inner: CachedInner = CachedInner()
+
+
+def test_cached_options(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("CLIDANTIC_CACHE_DIR", str(tmp_path))
+
+    def create_cli():
+        cli = Parser(cache=True)
+
+        @cli.command()
+        def run(config: CachedConfig):
+            print(config)
+
+        return cli, run
+
+    cli1, cmd1 = create_cli()
+    cache_files = list((tmp_path / "options").glob("*.json"))
+    assert len(cache_files) == 1
+    # the second parser is built from the cache, with equivalent options
+    monkeypatch.setattr("clidantic.cache.settings_to_specs", None)
+    cli2, cmd2 = create_cli()
+    for cached, original in zip(cmd2.params, cmd1.params):
+        assert cached.opts == original.opts
+        assert cached.secondary_opts == original.secondary_opts
+        assert type(cached.type) is type(original.type)
+        assert cached.default == original.default
+        assert cached.multiple == original.multiple
+        assert cached.help == original.help
+    result1 = runner.invoke(cli1, ["--help"])
+    result2 = runner.invoke(cli2, ["--help"])
+    assert result1.output == result2.output
+    args = ["--name=test", "--color=blue", "--level=2", "--inner.tags=a", "--inner.tags=b", "--inner.flag"]
+    result = runner.invoke(cli2, args)
+    assert not result.exception
+    assert "color=<Color.blue: 'blue'> level=2 inner=CachedInner(tags=['a', 'b'], flag=True)" in result.output
+
+
+def test_cached_options_invalidation(tmp_path: Path):
+    class Config(BaseModel):
+        value: int = 1
+
+    options = cached_settings_to_options(Config, ".", "__", directory=tmp_path)
+    assert options[0].default == 1
+    fingerprint = model_fingerprint(Config)
+
+    class Config(BaseModel):  # noqa: F811
+        value: int = 2
+
+    assert model_fingerprint(Config) != fingerprint
+    options = cached_settings_to_options(Config, ".", "__", directory=tmp_path)
+    assert options[0].default == 2
+    assert len(list((tmp_path / "options").glob("*.json"))) == 1
+
+
+def test_cached_options_sources(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    source = tmp_path / "cached_models.py"
+    source.write_text("from pydantic import BaseModel\n\nclass Config(BaseModel):\n    value: int = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("cached_models")
+    cache = tmp_path / "cache"
+    assert cached_settings_to_options(module.Config, ".", "__", directory=cache)[0].default == 1
+    # models defined in source files are validated by their files, without computing fingerprints
+    monkeypatch.setattr("clidantic.cache.model_fingerprint", None)
+    monkeypatch.setattr("clidantic.cache.settings_to_specs", None)
+    assert cached_settings_to_options(module.Config, ".", "__", directory=cache)[0].default == 1
+    monkeypatch.undo()
+    monkeypatch.syspath_prepend(str(tmp_path))
+    source.write_text("from pydantic import BaseModel\n\nclass Config(BaseModel):\n    value: int = 22\n")
+    module = importlib.reload(module)
+    assert cached_settings_to_options(module.Config, ".", "__", directory=cache)[0].default == 22
+    # non-serializable models are only marked, without trying to dump their options again
+    source.write_text("from pydantic import BaseModel\n\nclass Config(BaseModel):\n    value: bytes = b'a'\n")
+    module = importlib.reload(module)
+    assert cached_settings_to_options(module.Config, ".", "__", directory=cache)[0].default == b"a"
+    monkeypatch.setattr("clidantic.cache.dump_option", None)
+    assert cached_settings_to_options(module.Config, ".", "__", directory=cache)[0].default == b"a"
+    assert len(list((cache / "options").glob("*.json"))) == 1
+    del sys.modules["cached_models"]
+
+
+def test_cached_options_parent_sources(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    parent = tmp_path / "cached_parent.py"
+    parent.write_text("from pydantic import BaseModel\n\nclass Parent(BaseModel):\n    value: int = 1\n")
+    (tmp_path / "cached_child.py").write_text("from cached_parent import Parent\n\nclass Config(Parent):\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("cached_parent", "cached_child"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    module = importlib.import_module("cached_child")
+    cache = tmp_path / "cache"
+    assert [o.name for o in cached_settings_to_options(module.Config, ".", "__", directory=cache)] == ["value"]
+    # fields added to parent models declared in other modules invalidate the entry
+    parent.write_text(
+        "from pydantic import BaseModel\n\nclass Parent(BaseModel):\n    value: int = 1\n    other: int = 2\n"
+    )
+    importlib.reload(sys.modules["cached_parent"])
+    module = importlib.reload(module)
+    options = cached_settings_to_options(module.Config, ".", "__", directory=cache)
+    assert [o.name for o in options] == ["value", "other"]
+    for name in ("cached_parent", "cached_child"):
+        del sys.modules[name]
+
+
+def test_cached_options_large_integers():
+    class Config(BaseModel):
+        value: int = 2**70
+        values: List[int] = [1, -(2**70)]
+
+    # larger integers would not survive the fast JSON backend
+    for option in settings_to_options(Config, ".", "__"):
+        with pytest.raises(NotCacheable):
+            dump_option(option)
+
+
+def test_cached_help(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("CLIDANTIC_CACHE_DIR", str(tmp_path))
+
+    def create_cli():
+        cli = Parser(lazy=True, cache=True)
+
+        @cli.command()
+        def run(config: CachedConfig):
+            """Runs something."""
+
+        return cli, run
+
+    cli1, cmd1 = create_cli()
+    result = runner.invoke(cli1, ["--help"])
+    assert "Runs something." in result.output and "--inner.tags" in result.output
+    assert cmd1._loaded
+    # rendered once per width, then served from memory
+    monkeypatch.setattr(click.Command, "format_help", None)
+    assert runner.invoke(cli1, ["--help"]).output == result.output
+    assert len(list((tmp_path / "help").glob("*.json"))) == 1
+    # other processes read the message from disk, without building the options
+    cli2, cmd2 = create_cli()
+    assert runner.invoke(cli2, ["--help"]).output == result.output
+    assert not cmd2._loaded
+    # other widths and modified sources require rendering again
+    monkeypatch.undo()
+    monkeypatch.setenv("CLIDANTIC_CACHE_DIR", str(tmp_path))
+    cli3, cmd3 = create_cli()
+    assert runner.invoke(cli3, ["--help"], terminal_width=60).exit_code == 0
+    assert cmd3._loaded
+    for entry in (tmp_path / "help").glob("*.json"):
+        content = json.loads(entry.read_text())
+        content["sources"] = {path: 0 for path in content["sources"]}
+        entry.write_text(json.dumps(content))
+    cli4, cmd4 = create_cli()
+    result = runner.invoke(cli4, ["--help"])
+    assert cmd4._loaded and "Runs something." in result.output
+
+
+def test_cached_help_parent_sources(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    parent = tmp_path / "help_parent.py"
+    parent.write_text("from pydantic import BaseModel\n\nclass Parent(BaseModel):\n    value: int = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("CLIDANTIC_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delitem(sys.modules, "help_parent", raising=False)
+    module = importlib.import_module("help_parent")
+
+    class Config(module.Parent):
+        name: str = "a"
+
+    cli = Parser(cache=True)
+
+    @cli.command()
+    def run(config: Config):
+        pass
+
+    assert "--value" in runner.invoke(cli, ["--help"]).output
+    # parent models declared in other modules are tracked, invalidating the stored message
+    assert str(parent) in command_sources(cli.entrypoint.callback)
+    entry = next((tmp_path / "cache" / "help").glob("*.json"))
+    assert str(parent) in json.loads(entry.read_text())["sources"]
+    del sys.modules["help_parent"]
+
+
+def test_cached_help_context_defaults(runner: CliRunner):
+    cli = Parser()
+
+    @cli.command()
+    def run(config: CachedConfig):
+        pass
+
+    assert "[default: red]" in runner.invoke(cli, ["--help"]).output
+    # defaults provided by the context are never served from the cache
+    result = runner.invoke(cli, ["--help"], default_map={"color": "blue"})
+    assert "[default: blue]" in result.output
+    assert "[default: red]" in runner.invoke(cli, ["--help"]).output
+
+
+def test_kwargs_to_settings_nesting():
+    kwargs = {"animal__type": "dog", "animal__owner__name": "Mark", "animal__owner__age": None, "legs": 4}
+    expected = {"animal": {"type": "dog", "owner": {"name": "Mark"}}, "legs": 4}
+    assert kwargs_to_settings(kwargs, "__") == expected
+    paths = {"animal__type": (("animal",), "type"), "animal__owner__name": (("animal", "owner"), "name")}
+    assert kwargs_to_settings(kwargs, "__", paths=paths) == expected
+
+
+def test_deep_nesting(runner: CliRunner):
+    class Owner(BaseModel):
+        first_name: str
+        age: int = 30
+
+    class Animal(BaseModel):
+        kind: str = "dog"
+        owner: Owner
+
+    class Config(BaseModel):
+        animal: Animal
+        legs: int = 4
+
+    cli = Parser()
+
+    @cli.command()
+    def run(config: Config):
+        return config
+
+    assert [p.path for p in run.params] == [
+        ("animal", "kind"),
+        ("animal", "owner", "first_name"),
+        ("animal", "owner", "age"),
+        ("legs",),
+    ]
+    result = runner.invoke(cli, ["--animal.owner.first-name=Mark", "--animal.owner.age=40"], standalone_mode=False)
+    assert not result.exception
+    assert result.return_value == Config(animal=Animal(owner=Owner(first_name="Mark", age=40)))
+
+
+def test_async_command(runner: CliRunner):
+    cli = Parser()
+
+    class Config(BaseModel):
+        delay: float = 0.0
+
+    @cli.command()
+    async def wait(config: Config):
+        await asyncio.sleep(config.delay)
+        return asyncio.get_running_loop()
+
+    result1 = runner.invoke(cli, ["--delay=0.01"], standalone_mode=False)
+    result2 = runner.invoke(cli, [], standalone_mode=False)
+    assert not result1.exception and not result2.exception
+    assert isinstance(result1.return_value, asyncio.AbstractEventLoop)
+    # every invocation in the same thread shares the same loop
+    assert result1.return_value is result2.return_value
+    assert result1.return_value is get_event_loop()
+    results = list(cli.batch([[], ["--delay=0"]]))
+    assert all(r.return_value is get_event_loop() for r in results)
+
+
+def test_profiler(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(profiler, "enabled", False)
+    monkeypatch.setattr(profiler, "spans", [])
+    monkeypatch.setattr(profiler, "_registered", True)
+    assert extract_profile_flag(["--value=1"]) is None
+    assert not profiler.enabled
+    destination = tmp_path / "profile.trace.json"
+    assert extract_profile_flag(["--value=1", f"--clidantic-profile={destination}"]) == ["--value=1"]
+    assert profiler.enabled
+
+    class Config(BaseModel):
+        value: int
+
+    cli = Parser()
+
+    @cli.command()
+    def profiled(config: Config):
+        return config.value
+
+    result = runner.invoke(cli, ["--value=1"], standalone_mode=False)
+    assert not result.exception
+    assert result.return_value == 1
+    report = profiler.report()
+    names = [entry["name"] for entry in report]
+    assert names == ["signature", "options", "validate", "callback"]
+    assert report[2]["model"] == "Config"
+    assert all(entry["self"] <= entry["total"] for entry in report)
+    profiler.write()
+    trace = json.loads(destination.read_text())
+    assert len(trace["traceEvents"]) == 4
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
+
+
+def test_profiler_flag_on_import(tmp_path: Path):
+    # commands defined at import time are measured as with the environment variable
+    destination = tmp_path / "profile.json"
+    code = (
+        "from pydantic import BaseModel\n"
+        "from clidantic import Parser\n"
+        "class Config(BaseModel):\n"
+        "    value: int = 1\n"
+        "cli = Parser()\n"
+        "@cli.command()\n"
+        "def run(config: Config):\n"
+        "    print(config.value)\n"
+        "cli()\n"
+    )
+    args = [sys.executable, "-c", code, f"--clidantic-profile={destination}", "--value=2"]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    env.pop("CLIDANTIC_PROFILE", None)
+    result = subprocess.run(args, stdout=subprocess.PIPE, encoding="utf-8", env=env)
+    assert result.returncode == 0
+    assert result.stdout.strip() == "2"
+    names = [entry["name"] for entry in json.loads(destination.read_text())]
+    assert names[:2] == ["signature", "options"]
+
+
+def test_environment_variables(runner: CliRunner, monkeypatch: pytest.MonkeyPatch):
+    class Inner(BaseModel):
+        test_attribute: int = 0
+
+    class Config(BaseModel):
+        name: str
+        flag: bool = False
+        values: List[int] = []
+        example: Inner = Inner()
+
+    cli = Parser()
+
+    @cli.command(env_prefix="APP_")
+    def run(config: Config):
+        return config
+
+    monkeypatch.setenv("APP_NAME", "env")
+    monkeypatch.setenv("APP_FLAG", "true")
+    monkeypatch.setenv("APP_VALUES", "1 2")
+    monkeypatch.setenv("APP_EXAMPLE__TEST_ATTRIBUTE", "3")
+    result = runner.invoke(cli, [], standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value == Config(name="env", flag=True, values=[1, 2], example=Inner(test_attribute=3))
+    # command line arguments take precedence
+    result = runner.invoke(cli, ["--name=argv", "--example.test-attribute=4"], standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value.name == "argv"
+    assert result.return_value.example.test_attribute == 4
+    # the environment is read once per invocation
+    monkeypatch.delenv("APP_VALUES")
+    with cli.entrypoint.make_context("run", []) as ctx:
+        table = ctx.meta["clidantic.environment"]["APP_"]
+    assert table == {"APP_NAME": "env", "APP_FLAG": "true", "APP_EXAMPLE__TEST_ATTRIBUTE": "3"}
+    monkeypatch.delenv("APP_NAME")
+    result = runner.invoke(cli, [], standalone_mode=False)
+    assert isinstance(result.exception, click.MissingParameter)
+    # empty variables are ignored, the automatic prefix of the context is still used
+    monkeypatch.setenv("APP_FLAG", "")
+    monkeypatch.setenv("APP_EXAMPLE__TEST_ATTRIBUTE", "")
+    monkeypatch.setenv("AUTO_NAME", "auto")
+    for fast in (False, True):
+        cli.entrypoint.fast_parse = fast
+        result = runner.invoke(cli, [], standalone_mode=False, auto_envvar_prefix="AUTO")
+        assert not result.exception, result.output
+        assert result.return_value == Config(name="auto")
+
+
+def test_environment_lookups(runner: CliRunner, monkeypatch: pytest.MonkeyPatch):
+    lookups: List[str] = []
+
+    class Environ(dict):
+        def get(self, key: str, *args: Any) -> Any:
+            lookups.append(key)
+            return super().get(key, *args)
+
+    Config = create_model("Config", **{f"field_{i}": (int, i) for i in range(50)})
+    cli = Parser()
+
+    @cli.command(env_prefix="APP_")
+    def run(config: Config):
+        return config
+
+    monkeypatch.setattr(os, "environ", Environ(os.environ, APP_FIELD_1="10"))
+    result = runner.invoke(cli, [], standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value.field_1 == 10
+    # the environment is scanned once, unset options do not look up their variables again
+    assert not [key for key in lookups if key.startswith("APP_")]
+
+
+def test_concurrent_invocations():
+    class Config(BaseModel):
+        first: int = -1
+        second: int = -1
+
+    cli = Parser()
+
+    @cli.command()
+    def run(config: Config):
+        return config
+
+    cli._update_entrypoint()
+    command = cli.entrypoint
+
+    def invoke(index: int) -> Config:
+        args = [f"--first={index}"] if index % 2 else [f"--second={index}"]
+        with command.make_context("run", args) as ctx:
+            return command.invoke(ctx)
+
+    # force frequent thread switches, to interleave parsing and validation of different invocations
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(invoke, range(512)))
+    finally:
+        sys.setswitchinterval(interval)
+    for index, config in enumerate(results):
+        expected = Config(first=index) if index % 2 else Config(second=index)
+        assert config == expected
+
+
+def test_programmatic_invocation():
+    class Config(BaseModel):
+        value: int
+        nested: CachedInner = CachedInner()
+
+    cli = Parser(name="main")
+
+    @cli.command()
+    def single(config: Config):
+        return config
+
+    assert cli.invoke(["--value=1"]) == Config(value=1)
+    entrypoint = cli.entrypoint
+    assert cli.invoke(["--value=2"]).value == 2
+    assert cli.entrypoint is entrypoint
+    assert cli.call("single", value=3, nested={"tags": ["a"]}) == Config(value=3, nested=CachedInner(tags=["a"]))
+    assert cli.call([], value=4).value == 4
+    with pytest.raises(click.UsageError):
+        cli.invoke(["--value=x"])
+    with pytest.raises(click.UsageError):
+        cli.call("missing")
+
+    store = Parser(name="store")
+    calls = []
+
+    @store.command()
+    def add(config: Config):
+        calls.append(config.value)
+        return config.value
+
+    @store.command()
+    async def ping():
+        return "pong"
+
+    group = Parser.merge(cli, store)
+    assert group.invoke(["store", "add", "--value=5"]) == 5
+    assert group.call("store add", value="6") == 6
+    assert group.call(["store", "ping"]) == "pong"
+    assert calls == [5, 6]
+    with pytest.raises(click.UsageError):
+        group.call("store")
+    with pytest.raises(click.UsageError):
+        group.call("store add more")
+    with pytest.raises(click.exceptions.Exit):
+        group.invoke(["--help"])
+
+
+def test_command_run():
+    class Inner(BaseModel):
+        value: int = 0
+
+    class Config(BaseModel):
+        name: str
+        inner: Inner = Inner()
+
+    cli = Parser()
+
+    @cli.command()
+    def first(config: Config):
+        return config
+
+    @cli.command(lazy=True)
+    def second(config: Config):
+        return first.run(config, name=config.name.upper())
+
+    @cli.command()
+    def third():
+        return "empty"
+
+    assert isinstance(first, RunnableCommand)
+    assert isinstance(second, LazyCommand) and isinstance(second, RunnableCommand)
+    instance = Config(name="a")
+    assert first.run(instance) is instance
+    assert first.run({"name": "b", "inner": {"value": "1"}}) == Config(name="b", inner=Inner(value=1))
+    assert second.run(instance) == Config(name="A")
+    assert third.run() == "empty"
+    with pytest.raises(ValidationError):
+        first.run({"inner": {"value": 1}})
+    # trusted values are not validated, nested models are still created
+    trusted = first.run({"name": "c", "inner": {"value": "1"}}, validate=False)
+    assert isinstance(trusted.inner, Inner)
+    assert trusted.inner.value == "1"
+
+
+def test_command_run_update():
+    class Config(BaseModel):
+        name: str
+        payload: Json[Dict[str, int]]
+        count: int = 0
+
+    cli = Parser()
+
+    @cli.command()
+    def run(config: Config):
+        return config
+
+    # parsed values are not validated again when updating an instance, only the new ones are
+    instance = Config(name="a", payload='{"a": 1}')
+    updated = run.run(instance, count="2")
+    assert updated.payload == {"a": 1} and updated.count == 2 and updated.name == "a"
+    assert instance.count == 0
+    with pytest.raises(ValidationError):
+        run.run(instance, count="x")
+    assert run.run(instance, count="3", validate=False).count == "3"
+
+
+def test_compact_command(runner: CliRunner, monkeypatch: pytest.MonkeyPatch):
+    cli = Parser(compact=True)
+
+    @cli.command(env_prefix="APP_")
+    def run(config: CachedConfig):
+        return config
+
+    assert isinstance(run, LazyCommand) and run._loaded
+    assert all(isinstance(param, OptionSpec) for param in run._params)
+    # options are created on demand, independently for each request
+    assert [param.name for param in run.params] == ["name", "color", "level", "inner__tags", "inner__flag"]
+    assert run.params[0] is not run.params[0]
+    monkeypatch.setenv("APP_INNER__TAGS", "a b")
+    result = runner.invoke(cli, ["--name=test", "--color=blue", "--inner.flag"], standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value == CachedConfig(
+        name="test", color=Color.blue, inner=CachedInner(tags=["a", "b"], flag=True)
+    )
+    result = runner.invoke(cli, ["--help"])
+    assert "--inner.flag / --inner.no-flag" in result.output
+    result = runner.invoke(cli, ["--level=3"])
+    assert result.exit_code == 2
+
+
+def test_fast_parse(runner: CliRunner, monkeypatch: pytest.MonkeyPatch):
+    class Config(BaseModel):
+        name: str = CLIField("-n")
+        point: Tuple[int, int] = (0, 0)
+        inner: CachedInner = CachedInner()
+        color: Color = Color.red
+        count: int = 1
+
+    def create_cli(fast: bool) -> Parser:
+        cli = Parser(fast_parse=fast)
+
+        @cli.command(env_prefix="FAST_")
+        def run(config: Config):
+            return config
+
+        return cli
+
+    fast, slow = create_cli(True), create_cli(False)
+    monkeypatch.setenv("FAST_COUNT", "3")
+    supported = [
+        ["--name=a"],
+        ["-n", "a", "--point", "1", "2", "--inner.tags", "x", "--inner.tags=y", "--inner.flag", "--color", "blue"],
+        ["--name", "--count", "--inner.no-flag", "--count=5"],
+    ]
+    fallback = [["--help"], ["--name=a", "extra"], ["--nam=a"], ["--point", "1"], ["--count=x", "-n=a"], ["--count=2"]]
+    for args in supported + fallback:
+        expected = runner.invoke(slow, args, standalone_mode=False)
+        result = runner.invoke(fast, args, standalone_mode=False)
+        assert result.output == expected.output
+        assert result.return_value == expected.return_value
+        assert type(result.exception) is type(expected.exception)
+    # supported arguments never reach the click parser
+    monkeypatch.setattr(click.OptionParser, "parse_args", None)
+    for args in supported:
+        result = runner.invoke(fast, args, standalone_mode=False)
+        assert not result.exception, result.output
+        assert result.return_value.count == (5 if "--count=5" in args else 3)
+    # compact commands create new options for each invocation, sharing the same table
+    monkeypatch.undo()
+    compact = Parser(fast_parse=True, compact=True)
+
+    @compact.command()
+    def run(config: Config):
+        return config
+
+    tables = []
+    for args in supported:
+        result = runner.invoke(compact, args, standalone_mode=False)
+        assert result.return_value == runner.invoke(slow, args, standalone_mode=False).return_value
+        tables.append(compact.entrypoint._option_table[1])
+    assert tables[0] is not None and all(table is tables[0] for table in tables)
+
+
+def test_pydantic_conversion(runner: CliRunner):
+    class Config(BaseModel):
+        name: str
+        count: int = Field(1, gt=0)
+        ratio: float = 0.5
+        path: Path = Path(".")
+        point: Tuple[int, float] = (0, 0.0)
+        values: List[int] = []
+        inner: CachedInner = CachedInner()
+        color: Color = Color.red
+        strict: StrictInt = 1
+
+    def create_cli(conversion: str) -> Parser:
+        cli = Parser(conversion=conversion)
+
+        @cli.command()
+        def run(config: Config):
+            return config
+
+        return cli
+
+    raw, converted = create_cli("pydantic"), create_cli("click")
+    types = {param.name: param.type for param in raw.commands[0].params}
+    assert isinstance(types["ratio"], RawType)
+    # strict and constrained fields use generic function types, always converted by click
+    assert not isinstance(types["strict"], RawType) and not isinstance(types["count"], RawType)
+    cases = [
+        ["--help"],
+        ["--name=a", "--count=2", "--ratio=1e-3", "--path=/tmp", "--point", "1", "2.5", "--values=1", "--values=2"],
+        ["--name=a", "--inner.tags=x", "--inner.flag", "--color=blue"],
+        ["--name=a", "--count=x"],
+        ["--name=a", "--point", "1", "y"],
+        ["--name=a", "--values=1", "--values=z"],
+        ["--name=a", "--count=0"],
+        ["--name=a", "--strict", "5"],
+        ["--count=1"],
+    ]
+    for args in cases:
+        expected = runner.invoke(converted, args, standalone_mode=False)
+        result = runner.invoke(raw, args, standalone_mode=False)
+        assert result.output == expected.output
+        assert result.return_value == expected.return_value
+        assert type(result.exception) is type(expected.exception)
+        assert str(result.exception) == str(expected.exception)
@@ -0,0 +1,201 @@
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+import pytest
+from click.exceptions import BadParameter
+from click.testing import CliRunner
+from pydantic import BaseModel, Json, PositiveInt
+
+from clidantic import CLIField, Parser, inputs
+from clidantic.cache import NotCacheable, dump_option
+
+
+class Item(BaseModel):
+    name: str
+    count: int = 0
+
+
+class Config(BaseModel):
+    ids: List[int] = []
+    names: List[str] = []
+    items: List[Item] = []
+    mapping: Dict[str, int] = {}
+    raw: Json = None
+
+
+@pytest.fixture(scope="function")
+def cli() -> Parser:
+    cli = Parser()
+
+    @cli.command()
+    def run(config: Config):
+        return config
+
+    return cli
+
+
+def test_list_from_files(runner: CliRunner, cli: Parser, tmp_path: Path):
+    (tmp_path / "ids.txt").write_text("\n".join(str(i) for i in range(1000)) + "\n\n")
+    (tmp_path / "names.json").write_text(json.dumps(["a", "b"]))
+    (tmp_path / "items.jsonl").write_text('{"name": "x", "count": 1}\n{"name": "y"}\n')
+    args = [
+        "--ids=-1",
+        f"--ids=@{tmp_path / 'ids.txt'}",
+        f"--names=@{tmp_path / 'names.json'}",
+        "--names=@@escaped",
+        f"--items=@{tmp_path / 'items.jsonl'}",
+    ]
+    result = runner.invoke(cli, args, standalone_mode=False)
+    assert not result.exception, result.output
+    config = result.return_value
+    assert config.ids == [-1] + list(range(1000))
+    assert config.names == ["a", "b", "@escaped"]
+    assert config.items == [Item(name="x", count=1), Item(name="y")]
+
+
+def test_list_from_stdin(runner: CliRunner, cli: Parser):
+    result = runner.invoke(cli, ["--ids=@-"], input="1\n2\n3\n", standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value.ids == [1, 2, 3]
+
+
+def test_stdin_fast_parse(runner: CliRunner):
+    class Values(BaseModel):
+        mapping: Dict[str, int] = {}
+        ids: List[int] = []
+        count: int = 0
+
+    def create_cli(fast: bool) -> Parser:
+        cli = Parser(fast_parse=fast)
+
+        @cli.command()
+        def run(config: Values):
+            return config
+
+        return cli
+
+    # the standard input is never consumed before falling back to click
+    fast, slow = create_cli(True), create_cli(False)
+    for args in (["--mapping", "-", "--count=x"], ["--ids=@-", "--count=1"], ["--mapping", "-", "--count=1"]):
+        expected = runner.invoke(slow, args, input='{"a": 1}', standalone_mode=False)
+        result = runner.invoke(fast, args, input='{"a": 1}', standalone_mode=False)
+        assert result.output == expected.output
+        assert result.return_value == expected.return_value
+        assert type(result.exception) is type(expected.exception)
+
+
+def test_json_from_files(runner: CliRunner, cli: Parser, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    path = tmp_path / "mapping.json"
+    path.write_text(json.dumps({f"key{i}": i for i in range(100)}))
+    result = runner.invoke(cli, [f"--mapping=@{path}", f"--raw=@{path}"], standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value.mapping == {f"key{i}": i for i in range(100)}
+    assert result.return_value.raw == result.return_value.mapping
+    # large documents are memory-mapped
+    monkeypatch.setattr(inputs, "MMAP_THRESHOLD", 0)
+    result = runner.invoke(cli, ["--mapping", "-"], input='{"a": 1}', standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value.mapping == {"a": 1}
+    assert inputs.load_json(str(path)) == {f"key{i}": i for i in range(100)}
+
+
+def test_json_backend_fallback(runner: CliRunner, cli: Parser, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(inputs, "_fast_loads", None)
+    monkeypatch.setattr(inputs, "BUFFER_SUPPORT", False)
+    monkeypatch.setattr(inputs, "MMAP_THRESHOLD", 0)
+    path = tmp_path / "mapping.json"
+    path.write_text('{"a": 1}')
+    result = runner.invoke(cli, [f"--mapping=@{path}", '--items={"name": "z"}'], standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value.mapping == {"a": 1}
+    assert result.return_value.items == [Item(name="z")]
+
+
+def test_json_exact_values(runner: CliRunner, tmp_path: Path):
+    class Values(BaseModel):
+        counts: Dict[str, int] = {}
+        ratios: Dict[str, float] = {}
+
+    cli = Parser()
+
+    @cli.command()
+    def run(config: Values):
+        return config
+
+    # inline documents keep integers of any size and accept non-finite numbers, as the standard library does
+    args = ['--counts={"a": 123456789012345678901234567890}', '--ratios={"a": NaN}']
+    result = runner.invoke(cli, args, standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value.counts["a"] == 123456789012345678901234567890
+    # documents rejected by the fast backend are decoded again
+    path = tmp_path / "ratios.json"
+    path.write_text('{"a": Infinity}')
+    result = runner.invoke(cli, [f"--ratios=@{path}"], standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value.ratios == {"a": float("inf")}
+
+
+def test_reference_defaults(runner: CliRunner):
+    class Users(BaseModel):
+        names: List[str] = ["@admin"]
+
+    cli = Parser()
+
+    @cli.command()
+    def run(config: Users):
+        return config
+
+    # defaults are never read from files
+    result = runner.invoke(cli, [], standalone_mode=False)
+    assert not result.exception, result.output
+    assert result.return_value.names == ["@admin"]
+
+
+def test_input_errors(runner: CliRunner, cli: Parser, tmp_path: Path):
+    result = runner.invoke(cli, [f"--mapping=@{tmp_path / 'missing.json'}"], standalone_mode=False)
+    assert isinstance(result.exception, BadParameter)
+    assert "cannot be read" in str(result.exception)
+    result = runner.invoke(cli, [f"--ids=@{tmp_path / 'missing.txt'}"], standalone_mode=False)
+    assert isinstance(result.exception, BadParameter)
+    (tmp_path / "object.json").write_text("{}")
+    result = runner.invoke(cli, [f"--ids=@{tmp_path / 'object.json'}"], standalone_mode=False)
+    assert isinstance(result.exception, BadParameter)
+    assert "does not contain a JSON array" in str(result.exception)
+    (tmp_path / "invalid.json").write_text("{")
+    result = runner.invoke(cli, [f"--mapping=@{tmp_path / 'invalid.json'}"], standalone_mode=False)
+    assert isinstance(result.exception, BadParameter)
+
+
+def test_streamed_field(runner: CliRunner, tmp_path: Path):
+    class StreamConfig(BaseModel):
+        ids: Iterable[PositiveInt] = CLIField(stream=True, default=())
+        items: Iterable[Item] = CLIField(stream=True, default=())
+
+    cli = Parser()
+    consumed = []
+
+    @cli.command()
+    def run(config: StreamConfig):
+        assert isinstance(config.ids, Iterator)
+        for value in config.ids:
+            consumed.append(value)
+        return list(config.items)
+
+    path = tmp_path / "ids.txt"
+    path.write_text("1\n2\n3\n")
+    result = runner.invoke(cli, ["--ids=4", f"--ids=@{path}", '--items={"name": "x"}'], standalone_mode=False)
+    assert not result.exception, result.output
+    assert consumed == [4, 1, 2, 3]
+    assert result.return_value == [Item(name="x")]
+    # errors are raised while iterating, as usage errors
+    consumed.clear()
+    result = runner.invoke(cli, ["--ids=1", "--ids=0", "--ids=2"])
+    assert result.exit_code == 2
+    assert "'0': ensure this value is greater than 0" in result.output
+    assert consumed == [1]
+    result = runner.invoke(cli, ["--ids=a"])
+    assert result.exit_code == 2
+    # streamed options are never cached
+    with pytest.raises(NotCacheable):
+        dump_option(cli.commands[0].params[0])
@@ -0,0 +1,97 @@
+import logging
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+from clidantic import Parser
+from clidantic.client import send
+from clidantic.server import create_server
+
+LOG = logging.getLogger(__name__)
+
+
+class Config(BaseModel):
+    name: str
+    count: int = 1
+
+
+@pytest.fixture(scope="function")
+def server(tmp_path: Path):
+    cli = Parser(lazy=True)
+
+    @cli.command()
+    def hello(config: Config):
+        print(f"hello {config.name} x{config.count} from {os.getcwd()}")
+        print(os.environ.get("GREETING"), file=sys.stderr)
+
+    @cli.command()
+    def fail():
+        raise RuntimeError("boom")
+
+    cli._update_entrypoint()
+    socket_path = str(tmp_path / "cli.sock")
+    server = create_server(cli.entrypoint, socket_path, prog_name="cli")
+    # lazy commands are built once in the server process
+    assert hello._loaded and fail._loaded
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+    assert not os.path.exists(socket_path)
+
+
+def run_client(socket_path: str, args, cwd: str, env: dict = None):
+    out_read, out_write = os.pipe()
+    err_read, err_write = os.pipe()
+    with open(os.devnull, "rb") as stdin:
+        exit_code = send(socket_path, args, env=env, cwd=cwd, fds=(stdin.fileno(), out_write, err_write))
+    os.close(out_write)
+    os.close(err_write)
+    with os.fdopen(out_read) as out, os.fdopen(err_read) as err:
+        return exit_code, out.read(), err.read()
+
+
+def test_server_requests(server: str, tmp_path: Path):
+    env = dict(os.environ, GREETING="ciao")
+    exit_code, out, err = run_client(server, ["hello", "--name=test", "--count=2"], cwd=str(tmp_path), env=env)
+    LOG.debug(out)
+    assert exit_code == 0
+    assert out == f"hello test x2 from {tmp_path}\n"
+    assert err == "ciao\n"
+    # the server is not affected by previous requests
+    assert os.getcwd() != str(tmp_path)
+    assert "GREETING" not in os.environ or os.environ["GREETING"] != "ciao"
+    exit_code, out, err = run_client(server, ["hello"], cwd=str(tmp_path))
+    assert exit_code == 2
+    assert "Missing option '--name'" in err
+    exit_code, out, err = run_client(server, ["--help"], cwd=str(tmp_path))
+    assert exit_code == 0
+    assert "Usage: cli [OPTIONS] COMMAND [ARGS]..." in out
+    exit_code, out, err = run_client(server, ["fail"], cwd=str(tmp_path))
+    assert exit_code == 1
+    assert "RuntimeError: boom" in err
+
+
+def test_client_shim(server: str, tmp_path: Path):
+    env = dict(os.environ, CLIDANTIC_SOCKET=server, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run(
+        [sys.executable, "-m", "clidantic.client", "hello", "--name=shim"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        encoding="utf-8",
+        env=env,
+        cwd=str(tmp_path),
+    )
+    assert result.returncode == 0
+    assert result.stdout == f"hello shim x1 from {tmp_path}\n"
+    # the client does not need click or pydantic
+    code = "import sys, clidantic.client; print('click' in sys.modules or 'pydantic' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, encoding="utf-8", env=env)
+    assert result.stdout.strip() == "False"
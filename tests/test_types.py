@@ -1,6 +1,6 @@
 import json
 import logging
-from typing import Dict, List, Literal, Mapping, Type
+from typing import Dict, List, Literal, Mapping, Tuple, Type
 
 import pytest
 from click import Command, Context
@@ -9,7 +9,17 @@ from click.testing import CliRunner
 from pydantic import BaseModel, Json
 
 from clidantic import Parser
-from clidantic.types import BytesType, JsonType, LiteralChoice, ModuleType
+from clidantic.click import classify_type
+from clidantic.types import (
+    _IMPORT_CACHE,
+    BytesType,
+    JsonType,
+    LazyImport,
+    LiteralChoice,
+    ModuleType,
+    clear_import_cache,
+    import_object,
+)
 
 LOG = logging.getLogger(__name__)
 
@@ -149,6 +159,78 @@ def test_module_type(runner: CliRunner):
     assert not result.exception
 
 
+def test_import_cache():
+    from tests.utils.module import TestClass
+
+    clear_import_cache()
+    assert import_object("tests.utils.module.TestClass") is TestClass
+    assert "tests.utils.module.TestClass" in _IMPORT_CACHE
+    with pytest.raises(ImportError):
+        import_object("tests.utils.module.Missing")
+    # failures are cached as well
+    assert isinstance(_IMPORT_CACHE["tests.utils.module.Missing"], ImportError)
+    with pytest.raises(ImportError):
+        import_object("tests.utils.module.Missing")
+    clear_import_cache()
+    assert not _IMPORT_CACHE
+
+
+def test_lazy_import_type(runner: CliRunner):
+    from tests.utils.module import TestClass
+
+    class Settings(BaseModel):
+        field: LazyImport[TestClass] = LazyImport[TestClass]("tests.utils.module.TestClass")
+        plugins: List[LazyImport] = []
+
+    cli = Parser()
+
+    @cli.command()
+    def run(config: Settings):
+        return config
+
+    result = runner.invoke(cli, ["--help"])
+    assert not result.exception
+    assert "[default: tests.utils.module.TestClass]" in result.output
+    clear_import_cache()
+    args = ["--field=tests.utils.module.TestClass", "--plugins=tests.utils.missing.Plugin"]
+    result = runner.invoke(cli, args, standalone_mode=False)
+    assert not result.exception
+    config = result.return_value
+    # nothing is imported before the first use
+    assert not _IMPORT_CACHE
+    assert config.plugins == [LazyImport("tests.utils.missing.Plugin")]
+    assert config.field.resolve() is TestClass
+    assert config.field(arg=2).arg == 2
+    with pytest.raises(ImportError):
+        config.plugins[0].resolve()
+    # invalid paths are still rejected during parsing
+    result = runner.invoke(cli, ["--field=not a path"], standalone_mode=False)
+    assert isinstance(result.exception, BadParameter)
+    # bounds are checked on resolution
+    result = runner.invoke(cli, ["--field=json.loads"], standalone_mode=False)
+    assert not result.exception
+    with pytest.raises(TypeError):
+        result.return_value.field.resolve()
+
+
+def test_module_type_list(runner: CliRunner):
+    from tests.utils.module import TestClass
+
+    class Settings(BaseModel):
+        classes: List[Type[TestClass]]
+
+    cli = Parser()
+
+    @cli.command()
+    def run(config: Settings):
+        return config
+
+    args = ["--classes=tests.utils.module.TestClass", "--classes=tests.utils.module.TestClass"]
+    result = runner.invoke(cli, args, standalone_mode=False)
+    assert not result.exception
+    assert result.return_value.classes == [TestClass, TestClass]
+
+
 class StringLiteral(BaseModel):
     test: Literal["one", "two"]
 
@@ -208,3 +290,38 @@ def test_literal_type(runner: CliRunner, config_class: Type[BaseModel], expected
             expected_type = type(value)
             result = lit_type.convert(str(value), cmd.params[0], Context(cmd))
             assert isinstance(result, expected_type)
+
+
+def test_type_classification_cache():
+    class Inner(BaseModel):
+        names: List[str] = []
+
+    class Settings(BaseModel):
+        first: List[str] = []
+        second: List[str] = ["a"]
+        mapping: Dict[str, int] = {}
+        inner: Inner = Inner()
+
+    info = classify_type(List[str])
+    assert info.kind == "container"
+    assert info.multiple
+    assert info.container_args is str
+    assert info.name == "list"
+    assert classify_type(List[str]) is info
+    assert classify_type(Dict[str, int]).kind == "mapping"
+    assert not classify_type(Dict[str, int]).multiple
+    assert classify_type(Tuple[str, int]).container_args == (str, int)
+    assert not classify_type(Tuple[str, int]).multiple
+
+    cli = Parser()
+
+    @cli.command()
+    def run(config: Settings):
+        pass
+
+    # options sharing a type share the same classification
+    first, second, mapping, inner = run.params
+    assert first.multiple and second.multiple and inner.multiple
+    assert first.show_default == "empty list"
+    assert second.default == ("a",)
+    assert mapping.type is classify_type(Dict[str, int]).param_type
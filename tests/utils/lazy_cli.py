@@ -0,0 +1,13 @@
+from clidantic import Parser
+
+store = Parser(name="store")
+
+
+@store.command()
+def add():
+    print("added")
+
+
+@store.command()
+def remove():
+    print("removed")